@@ -3,6 +3,7 @@ Celery アプリケーション設定
 非同期処理基盤（ハンズオン一括生成は廃止、インタラクティブモードに移行）
 """
 from celery import Celery
+from celery.signals import worker_process_init
 import os
 
 # Dockerコンテナ内を想定（docker-compose.ymlで設定）
@@ -33,6 +34,7 @@ celery_app.conf.update(
     # リトライ設定
     task_acks_late=True,          # タスク完了後にACK
     task_reject_on_worker_lost=True,  # Worker停止時に再キュー
+    worker_prefetch_multiplier=1,  # 長時間のLLMタスクを先取りして抱え込まない（空いたWorkerが拾う）
 
     # 🔧 Redis コマンド最適化設定
     result_expires=3600,  # 結果を1時間で自動削除（デフォルト24時間）
@@ -64,5 +66,16 @@ celery_app.conf.update(
     imports=[],
 )
 
+
+@worker_process_init.connect
+def _dispose_inherited_engine(**kwargs):
+    """
+    prefork でフォークされたワーカーが親プロセスの接続プールを共有しないよう、
+    引き継いだ接続を破棄して各プロセスで新しいプールを使わせる
+    """
+    from database import engine
+    engine.dispose(close=False)
+
+
 if __name__ == "__main__":
     celery_app.start()
@@ -1,6 +1,7 @@
 import os
 from contextlib import contextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
@@ -10,9 +11,24 @@ load_dotenv()
 
 
 DATABASE_URL = os.getenv("DATABASE_URL")
-print(DATABASE_URL)
 # エンジンの作成
-engine = create_engine(DATABASE_URL, echo=False)
+# SQLAlchemyのコンパイル済みSQLキャッシュ（query_cache_size）はデフォルト500件。
+# ルーター・サービス全体のクエリ形がそれを超えて追い出されないよう広げておく。
+# あわせて接続プールを広げ、切断済みコネクションを使う前に検出する
+_engine_kwargs = {
+    "echo": False,
+    "query_cache_size": int(os.getenv("DB_QUERY_CACHE_SIZE", "1200")),
+}
+_url = make_url(DATABASE_URL)
+if _url.get_backend_name() != "sqlite":
+    _engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_pre_ping=True,
+        # 長時間アイドルの接続をDB/プロキシ側に切られる前に作り直す
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    )
+engine = create_engine(DATABASE_URL, **_engine_kwargs)
 
 # セッション作成用のファクトリ
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,5 +1,5 @@
 import uuid
-from datetime import date, datetime
+from datetime import date, datetime, timezone
 from sqlalchemy import (
     Column, String, Integer, Text, Date, DateTime, ForeignKey, Enum,
     Boolean, JSON, Index, func, Float, UniqueConstraint, CheckConstraint
@@ -8,6 +8,14 @@ from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from database import Base
 
+_UTC = timezone.utc
+
+
+def _utc_timestamp() -> str:
+    """対話履歴用のUTCタイムスタンプ（ミリ秒精度, 末尾Z）"""
+    return datetime.now(_UTC).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
 # =====================================================================
 # 既存：Member / ProjectBase / ProjectMember
 # =====================================================================
@@ -836,25 +844,23 @@ class ChangeRequest(Base):
 
     def add_user_message(self, content: str) -> None:
         """ユーザーメッセージを対話履歴に追加"""
-        from datetime import datetime
         if self.conversation is None:
             self.conversation = []
         self.conversation = self.conversation + [{
             "role": "user",
             "content": content,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }]
 
     def add_proposal_message(self, summary: str) -> None:
         """提案メッセージを対話履歴に追加"""
-        from datetime import datetime
         if self.conversation is None:
             self.conversation = []
         self.conversation = self.conversation + [{
             "role": "assistant",
             "type": "proposal",
             "summary": summary,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": _utc_timestamp()
         }]
 
 
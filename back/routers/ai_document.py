@@ -2,6 +2,8 @@
 AIドキュメント生成API
 frame_work_docからAIドキュメントを生成するエンドポイント
 """
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -11,6 +13,7 @@ from services.project import AIDocumentService
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 class AIDocumentGenerationRequest(BaseModel):
@@ -67,14 +70,10 @@ async def generate_ai_document(
         )
 
     except ValueError as e:
-        import traceback
-        print(f"ValueError in AI document generation: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("ValueError in AI document generation: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        import traceback
-        print(f"Exception in AI document generation: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("Exception in AI document generation: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error during AI document generation: {str(e)}"
@@ -1,12 +1,21 @@
 from fastapi import APIRouter, responses, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from database import get_db
 from services.tech import FrameworkService
+from functools import cached_property
 from typing import List, Optional
+from utils.streaming_json import sse_text_stream
 
 router = APIRouter()
 
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # nginx buffering無効化
+}
+
 # Pydantic モデル: 仕様書テキストを受け取る
 class Document(BaseModel):
     framework : str
@@ -16,6 +25,7 @@ class Document(BaseModel):
 class FrameworkRecommendationRequest(BaseModel):
     specification: str
     function_doc: Optional[str] = ""
+    project_id: Optional[str] = None
 
 class FrameworkSelectionRequest(BaseModel):
     project_id: str
@@ -28,31 +38,41 @@ class FrameworkEvaluationRequest(BaseModel):
     selected_technologies: List[str]
     platform: str
 
+    @cached_property
+    def selected_technologies_text(self) -> str:
+        """サービス層へ渡す結合済みの技術名（1リクエストにつき1度だけ結合する）"""
+        return ", ".join(self.selected_technologies)
+
 class GenerateDocumentRequest(BaseModel):
     project_id: str
     specification: str
     selected_technologies: List[str]
 
+    @cached_property
+    def selected_technologies_text(self) -> str:
+        return ", ".join(self.selected_technologies)
+
 @router.post("/")
-def generate_framework_priority(document: Document, db: Session = Depends(get_db)):
+async def generate_framework_priority(document: Document, db: Session = Depends(get_db)):
     """
     仕様書のテキストを受け取り、固定のフロントエンドおよびバックエンド候補の
     優先順位と理由を JSON 形式で返すAPI。
     """
     framework_service = FrameworkService(db=db)
-    result = framework_service.generate_framework_priority(document.specification)
+    result = await framework_service.generate_framework_priority(document.specification)
     return responses.JSONResponse(content=result, media_type="application/json")
 
 @router.post("/recommendations")
-def get_framework_recommendations(request: FrameworkRecommendationRequest, db: Session = Depends(get_db)):
+async def get_framework_recommendations(request: FrameworkRecommendationRequest, db: Session = Depends(get_db)):
     """
     仕様書と機能ドキュメントに基づいて推薦技術の名前、優先度、理由を返すAPI。
     """
     try:
         framework_service = FrameworkService(db=db)
-        result = framework_service.generate_framework_recommendations(
+        result = await framework_service.generate_framework_recommendations(
             request.specification,
-            request.function_doc
+            request.function_doc,
+            request.project_id,
         )
         return responses.JSONResponse(content=result, media_type="application/json")
     except Exception as e:
@@ -67,7 +87,7 @@ def get_technology_options(platform: str, db: Session = Depends(get_db)):
     """
     try:
         framework_service = FrameworkService(db=db)
-        result = framework_service.get_technology_options(platform)
+        result = framework_service.get_technology_option_dicts(platform)
         return responses.JSONResponse(content=result, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"技術オプション取得中にエラーが発生しました: {str(e)}")
@@ -89,16 +109,15 @@ def get_framework_selection(project_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"選択情報取得中にエラーが発生しました: {str(e)}")
 
 @router.post("/generate-document")
-def generate_framework_document_new(request: GenerateDocumentRequest, db: Session = Depends(get_db)):
+async def generate_framework_document_new(request: GenerateDocumentRequest, db: Session = Depends(get_db)):
     """
     選択された技術スタックに基づいてフレームワーク技術要件定義書を生成するAPI。
     """
     try:
         framework_service = FrameworkService(db=db)
-        technologies_text = ", ".join(request.selected_technologies)
-        result = framework_service.generate_framework_document(
+        result = await framework_service.generate_framework_document(
             request.specification,
-            technologies_text
+            request.selected_technologies_text
         )
         return responses.JSONResponse(content={
             "message": "技術要件定義書が生成されました",
@@ -109,27 +128,40 @@ def generate_framework_document_new(request: GenerateDocumentRequest, db: Sessio
         raise HTTPException(status_code=500, detail=f"ドキュメント生成中にエラーが発生しました: {str(e)}")
 
 @router.post("/evaluate-choice")
-def evaluate_framework_choice(request: FrameworkEvaluationRequest, db: Session = Depends(get_db)):
+async def evaluate_framework_choice(request: FrameworkEvaluationRequest, db: Session = Depends(get_db)):
     """
     選択されたフレームワークの妥当性を評価するAPI。
     """
     try:
         framework_service = FrameworkService(db=db)
-        result = framework_service.evaluate_framework_choice(
+        result = await framework_service.evaluate_framework_choice(
             request.specification,
             request.selected_technologies,
-            request.platform
+            request.platform,
+            request.selected_technologies_text
         )
         return responses.JSONResponse(content=result, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"評価中にエラーが発生しました: {str(e)}")
 
 @router.post("/document")
-def generate_framework_document(document: Document, db: Session = Depends(get_db)):
+async def generate_framework_document(document: Document, db: Session = Depends(get_db)):
     """
     仕様書のテキストと選択されたフレームワークを受け取り、
     そのフレームワークに沿った技術要件書を生成するAPI。
     """
     framework_service = FrameworkService(db=db)
-    result = framework_service.generate_framework_document(document.specification, document.framework)
+    result = await framework_service.generate_framework_document(document.specification, document.framework)
     return responses.JSONResponse(content=result, media_type="application/json")
+
+@router.post("/document/stream")
+async def stream_framework_document(document: Document, db: Session = Depends(get_db)):
+    """
+    技術要件書をSSE形式でストリーミング生成するAPI。
+    """
+    framework_service = FrameworkService(db=db)
+    return StreamingResponse(
+        sse_text_stream(framework_service.stream_framework_document(document.specification, document.framework)),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
@@ -97,6 +97,17 @@ class SessionStatusResponse(BaseModel):
 # ヘルパー関数
 # =====================================================
 
+# 技術スタック抽出用キーワード（表示名, 小文字）
+_TECH_STACK_KEYWORDS = tuple(
+    (keyword, keyword.lower())
+    for keyword in (
+        "Next.js", "React", "Vue", "Angular", "FastAPI", "Django",
+        "Express", "PostgreSQL", "MySQL", "MongoDB", "Redis",
+        "Tailwind", "TypeScript", "Python", "Node.js",
+    )
+)
+
+
 def _build_project_context(db: Session, project_id: UUID) -> Dict:
     """プロジェクトコンテキストを構築"""
     project = db.query(ProjectBase).filter(
@@ -113,13 +124,12 @@ def _build_project_context(db: Session, project_id: UUID) -> Dict:
     # 技術スタックを抽出（フレームワーク情報から）
     tech_stack = []
     if document and document.frame_work_doc:
-        # 簡易的な技術スタック抽出
-        keywords = ["Next.js", "React", "Vue", "Angular", "FastAPI", "Django",
-                   "Express", "PostgreSQL", "MySQL", "MongoDB", "Redis",
-                   "Tailwind", "TypeScript", "Python", "Node.js"]
-        for keyword in keywords:
-            if keyword.lower() in document.frame_work_doc.lower():
-                tech_stack.append(keyword)
+        # 簡易的な技術スタック抽出（ドキュメントの小文字化はキーワードごとではなく1度だけ）
+        frame_work_doc_lower = document.frame_work_doc.lower()
+        tech_stack = [
+            keyword for keyword, keyword_lower in _TECH_STACK_KEYWORDS
+            if keyword_lower in frame_work_doc_lower
+        ]
 
     return {
         "project_id": str(project.project_id),
@@ -163,7 +173,7 @@ def _get_project_implementation_overview(db: Session, project_id: UUID, exclude_
         if not resources:
             continue
 
-        task = db.query(Task).filter(Task.task_id == ho.task_id).first()
+        task = db.get(Task, ho.task_id)
         task_name = task.title if task else "不明なタスク"
 
         if resources.get("apis"):
@@ -245,7 +255,7 @@ def _get_dependency_context(db: Session, task_id: UUID, project_id: UUID = None)
     has_incomplete_predecessors = False
 
     for dep in predecessor_deps:
-        pred_task = db.query(Task).filter(Task.task_id == dep.source_task_id).first()
+        pred_task = db.get(Task, dep.source_task_id)
         if not pred_task:
             continue
 
@@ -297,7 +307,7 @@ def _get_dependency_context(db: Session, task_id: UUID, project_id: UUID = None)
 
     successor_tasks = []
     for dep in successor_deps:
-        succ_task = db.query(Task).filter(Task.task_id == dep.target_task_id).first()
+        succ_task = db.get(Task, dep.target_task_id)
         if succ_task:
             successor_tasks.append({
                 "task_id": str(succ_task.task_id),
@@ -374,7 +384,7 @@ async def start_interactive_session(
         task_uuid = UUID(task_id)
 
         # タスク取得
-        task = db.query(Task).filter(Task.task_id == task_uuid).first()
+        task = db.get(Task, task_uuid)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
@@ -646,7 +656,7 @@ async def resume_interactive_session(
         task_uuid = UUID(task_id)
 
         # タスク取得
-        task = db.query(Task).filter(Task.task_id == task_uuid).first()
+        task = db.get(Task, task_uuid)
         if not task:
             raise HTTPException(status_code=404, detail="Task not found")
 
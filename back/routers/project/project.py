@@ -117,13 +117,12 @@ async def create_project(project: ProjectBaseType, db: Session = Depends(get_db)
             db.add(db_project_member)
     
     db.commit()
-    db.refresh(db_project)
     return {"project_id": project_id, "message": "プロジェクトが作成されました"}
 
 # プロジェクトIDからプロジェクトを取得
 @router.get("/project/{project_id}", summary="プロジェクト取得")
 async def get_project(project_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_project = db.query(ProjectBase).filter(ProjectBase.project_id == project_id).first()
+    db_project = db.get(ProjectBase, project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return db_project
@@ -139,12 +138,11 @@ async def update_project(project_id: str, project: ProjectBaseType, db: Session
     db_project.start_date = project.start_date
     db_project.end_date = project.end_date
     db.commit()
-    db.refresh(db_project)
     return {"message": "プロジェクトが更新されました"}
 
 @router.delete("/project/{project_id}", summary="プロジェクト削除")
 async def delete_project(project_id: uuid.UUID, db: Session = Depends(get_db)):
-    db_project = db.query(ProjectBase).filter(ProjectBase.project_id == project_id).first()
+    db_project = db.get(ProjectBase, project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
@@ -197,7 +195,6 @@ async def patch_project(project_id: str, project: ProjectPatch, db: Session = De
         setattr(db_project, key, value)
 
     db.commit()
-    db.refresh(db_project)
     return {"message": "Project partially updated successfully"}
 
 
@@ -210,7 +207,7 @@ async def get_project_progress(project_id: uuid.UUID, db: Session = Depends(get_
     フロー: QA → 仕様書 → 機能要件 → 技術選定 → 機能構造化 → タスク
     """
     # プロジェクト存在確認
-    db_project = db.query(ProjectBase).filter(ProjectBase.project_id == project_id).first()
+    db_project = db.get(ProjectBase, project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -125,7 +125,7 @@ def _ensure_dependency_exists(db: Session, task_id: Optional[uuid.UUID]) -> None
 
 
 def _get_task_or_404(db: Session, task_id: uuid.UUID) -> Task:
-    task = db.query(Task).filter(Task.task_id == task_id).first()
+    task = db.get(Task, task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -1,3 +1,5 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -9,6 +11,7 @@ from models.project_base import ProjectDocument
 import uuid
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class ProjectIdRequest(BaseModel):
     project_id: Union[str, uuid.UUID]
@@ -123,10 +126,10 @@ def save_summary(request: SummaryRequest, db: Session = Depends(get_db)):
         else:
             project_id = request.project_id
             
-        project_doc = summary_service.save_summary_to_project_document(project_id, request.summary)
+        doc_id = summary_service.save_summary_to_project_document(project_id, request.summary)
         return {
             "message": "Summary saved successfully",
-            "doc_id": str(project_doc.doc_id)
+            "doc_id": str(doc_id)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save summary: {str(e)}")
@@ -204,8 +207,6 @@ async def get_confidence_feedback(request: ProjectIdRequest, db: Session = Depen
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {str(e)}")
     except Exception as e:
-        import traceback
-        error_detail = f"Internal server error: {str(e)}\nTraceback: {traceback.format_exc()}"
-        print(error_detail)  # サーバーログに出力
+        logger.exception("Internal server error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
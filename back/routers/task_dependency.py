@@ -3,6 +3,7 @@ Task Dependency API Router
 Provides endpoints for retrieving task dependencies
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List
 from pydantic import BaseModel
@@ -59,18 +60,12 @@ async def get_task_dependencies_by_project(
     try:
         # Validate project_id is a valid UUID
         try:
-            uuid.UUID(project_id)
+            project_uuid = uuid.UUID(project_id)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid project_id format")
 
-        # Get all tasks for this project
-        tasks = db.query(Task).filter_by(project_id=project_id).all()
-
-        if not tasks:
-            return []
-
-        # Get all task IDs
-        task_ids = [task.task_id for task in tasks]
+        # Task IDs for this project (resolved in SQL; full task rows are not loaded)
+        task_ids = select(Task.task_id).where(Task.project_id == project_uuid)
 
         # Get all dependencies where both source and target are in this project
         dependencies = db.query(TaskDependency).filter(
@@ -169,8 +164,8 @@ async def create_task_dependency(
             raise HTTPException(status_code=400, detail="Invalid task_id format")
 
         # Verify both tasks exist
-        source_task = db.query(Task).filter_by(task_id=source_uuid).first()
-        target_task = db.query(Task).filter_by(task_id=target_uuid).first()
+        source_task = db.get(Task, source_uuid)
+        target_task = db.get(Task, target_uuid)
 
         if not source_task:
             raise HTTPException(status_code=404, detail=f"Source task {dependency.source_task_id} not found")
@@ -1,17 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from database import get_db
 from services.tech import TechnologyService
+from functools import cached_property
 from typing import List, Optional
+from utils.streaming_json import sse_text_stream
 
 router = APIRouter()
 
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # nginx buffering無効化
+}
+
 class TechnologyDocumentRequest(BaseModel):
     selected_technologies: List[str]
     framework_doc: Optional[str] = ""
 
+    @cached_property
+    def selected_technologies_text(self) -> str:
+        """結合済みの技術名（カンマ区切り）"""
+        return ", ".join(self.selected_technologies)
+
 class InstallationGuideRequest(BaseModel):
     technology_name: str
 
@@ -19,17 +32,22 @@ class EnvironmentSetupRequest(BaseModel):
     selected_technologies: List[str]
     project_type: Optional[str] = "web"
 
+    @cached_property
+    def selected_technologies_text(self) -> str:
+        return ", ".join(self.selected_technologies)
+
 @router.post("/document")
-def generate_technology_document(request: TechnologyDocumentRequest, db: Session = Depends(get_db)):
+async def generate_technology_document(request: TechnologyDocumentRequest, db: Session = Depends(get_db)):
     """
     選択された技術に基づいて、Docker環境でのインストール手順と
     公式ドキュメントへのリンクを含む技術ドキュメントを生成するAPI。
     """
     try:
         technology_service = TechnologyService(db=db)
-        result = technology_service.generate_technology_document(
+        result = await technology_service.generate_technology_document(
             request.selected_technologies,
-            request.framework_doc
+            request.framework_doc,
+            request.selected_technologies_text
         )
         return JSONResponse(content={
             "message": "技術ドキュメントが生成されました",
@@ -39,31 +57,64 @@ def generate_technology_document(request: TechnologyDocumentRequest, db: Session
         raise HTTPException(status_code=500, detail=f"技術ドキュメント生成中にエラーが発生しました: {str(e)}")
 
 @router.post("/installation-guide")
-def get_installation_guide(request: InstallationGuideRequest, db: Session = Depends(get_db)):
+async def get_installation_guide(request: InstallationGuideRequest, db: Session = Depends(get_db)):
     """
     特定の技術のインストールガイドと公式ドキュメントリンクを取得するAPI。
     """
     try:
         technology_service = TechnologyService(db=db)
-        result = technology_service.get_technology_installation_guide(request.technology_name)
+        result = await technology_service.get_technology_installation_guide(request.technology_name)
         return JSONResponse(content=result, media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"インストールガイド取得中にエラーが発生しました: {str(e)}")
 
 @router.post("/environment-setup")
-def generate_environment_setup(request: EnvironmentSetupRequest, db: Session = Depends(get_db)):
+async def generate_environment_setup(request: EnvironmentSetupRequest, db: Session = Depends(get_db)):
     """
     選択された技術スタックに基づいて、統合的な開発環境のセットアップガイドを生成するAPI。
     """
     try:
         technology_service = TechnologyService(db=db)
-        result = technology_service.generate_development_environment_setup(
+        result = await technology_service.generate_development_environment_setup(
             request.selected_technologies,
-            request.project_type
+            request.project_type,
+            request.selected_technologies_text
         )
         return JSONResponse(content={
             "message": "開発環境セットアップガイドが生成されました",
             "environment_setup": result
         }, media_type="application/json")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"環境セットアップガイド生成中にエラーが発生しました: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"環境セットアップガイド生成中にエラーが発生しました: {str(e)}")
+
+@router.post("/document/stream")
+async def stream_technology_document(request: TechnologyDocumentRequest, db: Session = Depends(get_db)):
+    """
+    技術ドキュメントをSSE形式でストリーミング生成するAPI。
+    """
+    technology_service = TechnologyService(db=db)
+    return StreamingResponse(
+        sse_text_stream(technology_service.stream_technology_document(
+            request.selected_technologies,
+            request.framework_doc,
+            request.selected_technologies_text
+        )),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
+
+@router.post("/environment-setup/stream")
+async def stream_environment_setup(request: EnvironmentSetupRequest, db: Session = Depends(get_db)):
+    """
+    開発環境セットアップガイドをSSE形式でストリーミング生成するAPI。
+    """
+    technology_service = TechnologyService(db=db)
+    return StreamingResponse(
+        sse_text_stream(technology_service.stream_development_environment_setup(
+            request.selected_technologies,
+            request.project_type,
+            request.selected_technologies_text
+        )),
+        media_type="text/event-stream",
+        headers=_SSE_HEADERS,
+    )
@@ -11,6 +11,7 @@ from typing import Dict, Any, List
 
 from ..base_handler import BaseChatHandler
 from ..chat_router import ChatRouter
+from sqlalchemy.orm import load_only
 from models.project_base import ProjectDocument, StructuredFunction, ProjectBase
 
 
@@ -49,6 +50,7 @@ class FrameworkHandler(BaseChatHandler):
         # 仕様書を取得
         doc = (
             self.db.query(ProjectDocument)
+            .options(load_only(ProjectDocument.function_doc))
             .filter(ProjectDocument.project_id == self.project_id)
             .first()
         )
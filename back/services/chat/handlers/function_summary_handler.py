@@ -13,6 +13,7 @@ from datetime import date
 
 from ..base_handler import BaseChatHandler
 from ..chat_router import ChatRouter
+from sqlalchemy.orm import load_only
 from models.project_base import ProjectDocument, QA, ProjectBase, ProjectMember, StructuredFunction
 
 
@@ -62,6 +63,7 @@ class FunctionSummaryHandler(BaseChatHandler):
         # 機能要件書を取得
         doc = (
             self.db.query(ProjectDocument)
+            .options(load_only(ProjectDocument.function_doc))
             .filter(ProjectDocument.project_id == self.project_id)
             .first()
         )
@@ -36,27 +36,24 @@ class KanbanHandler(BaseChatHandler):
         """
         context = {}
 
-        # メンバー一覧を取得
+        # メンバー一覧を取得（MemberBase はJOINで同時に取得する）
         project_members = (
-            self.db.query(ProjectMember)
+            self.db.query(ProjectMember, MemberBase.member_skill)
+            .join(MemberBase, MemberBase.member_id == ProjectMember.member_id)
             .filter(ProjectMember.project_id == self.project_id)
             .all()
         )
 
         members = []
         member_skills = {}
-        for pm in project_members:
-            member = self.db.query(MemberBase).filter(
-                MemberBase.member_id == pm.member_id
-            ).first()
-            if member:
-                members.append({
-                    "project_member_id": str(pm.project_member_id),
-                    "member_id": str(pm.member_id),
-                    "member_name": pm.member_name,
-                    "skill": member.member_skill,
-                })
-                member_skills[str(pm.project_member_id)] = member.member_skill
+        for pm, member_skill in project_members:
+            members.append({
+                "project_member_id": str(pm.project_member_id),
+                "member_id": str(pm.member_id),
+                "member_name": pm.member_name,
+                "skill": member_skill,
+            })
+            member_skills[str(pm.project_member_id)] = member_skill
 
         context["members"] = members
 
@@ -11,6 +11,7 @@ from typing import Dict, Any, List
 
 from ..base_handler import BaseChatHandler
 from ..chat_router import ChatRouter
+from sqlalchemy.orm import load_only
 from models.project_base import ProjectDocument, QA, ProjectBase
 
 
@@ -44,6 +45,7 @@ class SpecReviewHandler(BaseChatHandler):
         # 仕様書を取得
         doc = (
             self.db.query(ProjectDocument)
+            .options(load_only(ProjectDocument.specification))
             .filter(ProjectDocument.project_id == self.project_id)
             .first()
         )
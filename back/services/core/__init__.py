@@ -2,7 +2,9 @@
 # 共通基盤クラスと設定ファイル
 
 from .base_service import BaseService
+from .semantic_cache import SemanticCache
 
 __all__ = [
     "BaseService",
+    "SemanticCache",
 ]
@@ -1,14 +1,17 @@
 import os
+import time
 import tomllib
 import logging
+import threading
+from functools import lru_cache
 from logging import Logger
 from logging.handlers import RotatingFileHandler
 from dotenv import load_dotenv
 
 # LangChain & Model
-from langchain_openai import ChatOpenAI
+# OpenAI / Anthropic のクライアントは import だけで数秒かかるため、使うときに _load_llm 内で読み込む
 from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_anthropic import ChatAnthropic
+from langchain_core.prompts import ChatPromptTemplate
 from typing import Dict, Any, List, Tuple, Optional, Type, AsyncGenerator, Literal
 from pydantic import BaseModel
 from models.project_base import ProjectDocument  # 未使用なら削除可
@@ -68,6 +71,48 @@ def _configure_logging() -> Logger:
 
 LOGGER = _configure_logging()
 
+
+# ---- prompts.toml キャッシュ ---------------------------------------------
+# サービスはリクエストごとに生成されるため、TOMLの読み込み・パースはプロセス内で共有する。
+# 開発中の編集を反映できるよう、PROMPTS_RECHECK_SECONDS 間隔で mtime を確認して再読込する。
+_PROMPTS_RECHECK_SECONDS = float(os.getenv("PROMPTS_RECHECK_SECONDS", "2"))
+_PROMPTS_LOCK = threading.Lock()
+_PROMPTS_CACHE: Dict[str, Any] = {"mtime": None, "checked_at": 0.0, "prompts": None}
+
+
+def _load_prompts(prompts_path: str) -> Dict[str, Dict[str, str]]:
+    """prompts.toml を読み込む（mtimeが変わらない限りキャッシュを返す）"""
+    now = time.monotonic()
+    with _PROMPTS_LOCK:
+        cached = _PROMPTS_CACHE["prompts"]
+        if cached is not None and now - _PROMPTS_CACHE["checked_at"] < _PROMPTS_RECHECK_SECONDS:
+            return cached
+
+        mtime = os.stat(prompts_path).st_mtime
+        _PROMPTS_CACHE["checked_at"] = now
+        if cached is not None and mtime == _PROMPTS_CACHE["mtime"]:
+            return cached
+
+        with open(prompts_path, "rb") as f:
+            prompts = tomllib.load(f)
+        _PROMPTS_CACHE["mtime"] = mtime
+        _PROMPTS_CACHE["prompts"] = prompts
+        return prompts
+
+
+@lru_cache(maxsize=128)
+def _build_prompt_template(template: str, format_instructions: Optional[str] = None) -> ChatPromptTemplate:
+    """
+    テンプレート文字列からChatPromptTemplateを生成する（同一テンプレートはプロセス内で再利用）。
+    サービスはリクエストごとに生成されるため、インスタンスではなくモジュール単位でキャッシュする。
+    """
+    if format_instructions is None:
+        return ChatPromptTemplate.from_template(template)
+    return ChatPromptTemplate.from_template(
+        template,
+        partial_variables={"format_instructions": format_instructions},
+    )
+
 # ---- .env 読み込み ------------------------------------------------------
 dotenv_path = "/workspaces/hackthon_support_agent/back/.env.local"
 load_dotenv(dotenv_path)
@@ -87,9 +132,8 @@ class BaseService:
         # プロンプトの読み込み
         prompts_path = os.path.join(os.path.dirname(__file__), "prompts.toml")
         try:
-            with open(prompts_path, "rb") as f:
-                self.prompts: Dict[str, Dict[str, str]] = tomllib.load(f)
-            self.logger.info("Prompts loaded from %s", prompts_path)
+            self.prompts: Dict[str, Dict[str, str]] = _load_prompts(prompts_path)
+            self.logger.debug("Prompts loaded from %s", prompts_path)
         except FileNotFoundError:
             self.logger.exception("prompts.toml not found at %s", prompts_path)
             raise
@@ -132,6 +176,8 @@ class BaseService:
                         kwargs["thinking_budget"] = thinking_budget
                     llm = ChatGoogleGenerativeAI(**kwargs)
                 case "openai":
+                    from langchain_openai import ChatOpenAI
+
                     has_key = bool(os.getenv("OPENAI_API_KEY"))
                     if not has_key:
                         self.logger.warning("OPENAI_API_KEY is not set")
@@ -141,6 +187,8 @@ class BaseService:
                         openai_api_key=os.getenv("OPENAI_API_KEY"),
                     )
                 case "anthropic":
+                    from langchain_anthropic import ChatAnthropic
+
                     has_key = bool(os.getenv("ANTHROPIC_API_KEY"))
                     if not has_key:
                         self.logger.warning("ANTHROPIC_API_KEY is not set")
@@ -182,6 +230,17 @@ class BaseService:
                 f"Prompt '{prompt_name}' not found in service '{service_name}' in prompts.toml"
             )
 
+    def get_prompt_template(
+        self,
+        service_name: str,
+        prompt_name: str,
+        format_instructions: Optional[str] = None,
+    ) -> ChatPromptTemplate:
+        """
+        TOMLのプロンプトからChatPromptTemplateを取得する（生成結果はキャッシュされる）。
+        """
+        return _build_prompt_template(self.get_prompt(service_name, prompt_name), format_instructions)
+
     def invoke_with_search(
         self,
         prompt: str,
@@ -0,0 +1,271 @@
+"""
+LLM出力のセマンティックキャッシュ
+
+入力テキストの埋め込みベクトルとコサイン類似度で過去の出力を引き当て、
+意味的にほぼ同じ入力では LLM呼び出しを丸ごと省略する。冪等な（入力だけで出力が決まる）メソッドにのみ使うこと。
+類似ヒットは scope（プロジェクトIDなど）の中でだけ行い、別プロジェクトの出力は返さない。
+similarity=False の場合は入力テキストの完全一致だけを見る（埋め込みは計算しない）。
+
+保存先は Celery と共用の Redis（REDIS_URL）。RediSearch を前提にしないため、
+名前空間(+scope)ごとに次のキーを持つ:
+    {key}:out  ハッシュ {entry_id: {"output": ..., "created_at": ...}}
+    {key}:emb  ハッシュ {entry_id: 正規化済み float32 ベクトルのバイト列}
+    {key}:ts   ソート済みセット {entry_id: created_at}（期限切れ・上限超過の削除用）
+    {key}:ver  埋め込みが追加/削除されるたびに増えるカウンタ
+検索時は :ver が変わっていなければプロセス内の行列をそのまま使い、変わっていれば
+:emb を1回読み直して numpy でまとめて内積を取る（件数は SEMANTIC_CACHE_MAX_ENTRIES で上限）。
+入力テキストが完全一致する場合は埋め込み計算も行わない。
+
+Redis に接続できない場合はしばらくキャッシュなしとして振る舞う（fail-open）。
+それ以外のエラー（埋め込みAPIの入力長超過など）はその呼び出しだけキャッシュを使わない。
+
+環境変数:
+    SEMANTIC_CACHE_ENABLED=true|false（既定 false）
+    SEMANTIC_CACHE_THRESHOLD=0.92（コサイン類似度のしきい値）
+    SEMANTIC_CACHE_TTL_SECONDS=86400
+    SEMANTIC_CACHE_MAX_ENTRIES=1000
+    SEMANTIC_CACHE_EMBEDDING_MODEL=models/gemini-embedding-001
+    SEMANTIC_CACHE_EMBEDDING_DIM=768
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import weakref
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("hackthon_support_agent.SemanticCache")
+
+_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+_EMBEDDING_MODEL = os.getenv("SEMANTIC_CACHE_EMBEDDING_MODEL", "models/gemini-embedding-001")
+_EMBEDDING_DIM = int(os.getenv("SEMANTIC_CACHE_EMBEDDING_DIM", "768"))
+_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 接続失敗後はしばらくRedisへ問い合わせない（毎リクエストでタイムアウトを待たないため）
+_RETRY_AFTER_SECONDS = 60.0
+
+# プロセス内に保持する埋め込み行列の数（キー = 名前空間+scope）
+_MAX_LOCAL_MATRICES = 64
+
+# redis.asyncio のクライアントは作成したイベントループに紐づくため、ループごとに持つ
+_redis_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_embeddings = None
+_unavailable_until = 0.0
+
+# key -> (:ver の値, entry_id のリスト, 行ごとに正規化済みの埋め込み行列)
+_matrices: "OrderedDict[str, Tuple[Optional[bytes], List[bytes], np.ndarray]]" = OrderedDict()
+
+
+def _get_redis():
+    loop = asyncio.get_running_loop()
+    client = _redis_clients.get(loop)
+    if client is None:
+        import redis.asyncio as aioredis
+        client = _redis_clients[loop] = aioredis.from_url(
+            _REDIS_URL,
+            socket_connect_timeout=0.5,
+            socket_timeout=1.0,
+        )
+    return client
+
+
+def _get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        _embeddings = GoogleGenerativeAIEmbeddings(
+            model=_EMBEDDING_MODEL,
+            google_api_key=os.getenv("GOOGLE_API_KEY"),
+            task_type="SEMANTIC_SIMILARITY",
+            output_dimensionality=_EMBEDDING_DIM,
+        )
+    return _embeddings
+
+
+async def _embed(text: str) -> np.ndarray:
+    """入力テキストの埋め込み（L2正規化済み float32。内積 = コサイン類似度）"""
+    vector = np.asarray(await _get_embeddings().aembed_query(text), dtype=np.float32)
+    return vector / (np.linalg.norm(vector) + 1e-12)
+
+
+def _entry_id(text: str) -> str:
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    埋め込み類似度によるLLM出力キャッシュ。
+
+    Example:
+        _CACHE = SemanticCache("framework_service.recommendations")
+
+        cached, embedding = await _CACHE.aget(text, scope=project_id)
+        if cached is not None:
+            return cached
+        result = await chain.ainvoke(...)
+        await _CACHE.aset(text, result, embedding=embedding, scope=project_id)
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        schema_version: str = "v1",
+        threshold: Optional[float] = None,
+        ttl_seconds: Optional[int] = None,
+        similarity: bool = True,
+    ):
+        """
+        namespace: キャッシュの名前空間（メソッド単位で分ける）
+        schema_version: 出力スキーマやプロンプトを変えたら上げる（古いエントリを無効化）
+        threshold: コサイン類似度のしきい値（未指定なら SEMANTIC_CACHE_THRESHOLD）
+        ttl_seconds: エントリの有効期間（未指定なら SEMANTIC_CACHE_TTL_SECONDS）
+        similarity: False なら完全一致のみ（表記が近くても別物になる入力向け）
+        """
+        self.key = f"semcache:{namespace}:{schema_version}:d{_EMBEDDING_DIM}"
+        self.threshold = _THRESHOLD if threshold is None else threshold
+        self.ttl_seconds = _TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.similarity = similarity
+
+    def _scoped_key(self, scope: Optional[str]) -> str:
+        return self.key if scope is None else f"{self.key}:{scope}"
+
+    @staticmethod
+    def _available() -> bool:
+        return _ENABLED and time.monotonic() >= _unavailable_until
+
+    @staticmethod
+    def _handle_error(e: Exception) -> None:
+        """Redisに繋がらない場合だけしばらく無効化し、それ以外はこの呼び出しだけ諦める"""
+        global _unavailable_until
+        from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+
+        if isinstance(e, (RedisConnectionError, RedisTimeoutError, OSError)):
+            _unavailable_until = time.monotonic() + _RETRY_AFTER_SECONDS
+            logger.warning("Semantic cache unavailable, bypassing for %.0fs: %s", _RETRY_AFTER_SECONDS, e)
+        else:
+            logger.warning("Semantic cache skipped: %s", e)
+
+    def _fresh_output(self, raw: Optional[bytes], now: float) -> Optional[Any]:
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if now - entry["created_at"] >= self.ttl_seconds:
+            return None
+        return entry["output"]
+
+    @staticmethod
+    async def _load_matrix(redis, key: str) -> Tuple[List[bytes], np.ndarray]:
+        """埋め込み行列を返す（:ver が変わっていなければプロセス内のものを再利用）"""
+        version = await redis.get(f"{key}:ver")
+        cached = _matrices.get(key)
+        if cached is not None and cached[0] == version:
+            _matrices.move_to_end(key)
+            return cached[1], cached[2]
+
+        blobs = await redis.hgetall(f"{key}:emb")
+        ids = list(blobs)
+        if ids:
+            matrix = np.frombuffer(b"".join(blobs.values()), dtype=np.float32).reshape(len(ids), -1)
+        else:
+            matrix = np.empty((0, _EMBEDDING_DIM), dtype=np.float32)
+        _matrices[key] = (version, ids, matrix)
+        if len(_matrices) > _MAX_LOCAL_MATRICES:
+            _matrices.popitem(last=False)
+        return ids, matrix
+
+    async def aget(self, text: str, scope: Optional[str] = None) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        類似入力のキャッシュ済み出力を返す。
+
+        Returns:
+            (出力, 入力の埋め込み)。ヒットしなければ出力は None。
+            埋め込みを計算した場合はそれも返すので、ミス時は aset にそのまま渡す
+            （同じ入力で埋め込みAPIを2回呼ばないため）。
+        """
+        if not self._available():
+            return None, None
+        key = self._scoped_key(scope)
+        embedding = None
+        try:
+            redis = _get_redis()
+            now = time.time()
+
+            # 完全一致なら埋め込み計算を省略
+            output = self._fresh_output(await redis.hget(f"{key}:out", _entry_id(text)), now)
+            if output is not None:
+                logger.debug("Semantic cache exact hit (%s)", key)
+                return output, None
+            if not self.similarity:
+                return None, None
+
+            ids, matrix = await self._load_matrix(redis, key)
+            if not ids:
+                return None, None
+
+            embedding = await _embed(text)
+            scores = matrix @ embedding
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None, embedding
+            output = self._fresh_output(await redis.hget(f"{key}:out", ids[best]), now)
+            if output is not None:
+                logger.debug("Semantic cache hit (%s, score=%.3f)", key, scores[best])
+            return output, embedding
+        except Exception as e:
+            self._handle_error(e)
+            return None, embedding
+
+    async def aset(
+        self,
+        text: str,
+        output: Any,
+        embedding: Optional[np.ndarray] = None,
+        scope: Optional[str] = None,
+    ) -> None:
+        """出力をキャッシュに保存する（JSONに変換できる値のみ）。embedding は aget が返したもの。"""
+        if not self._available():
+            return
+        key = self._scoped_key(scope)
+        out_key, emb_key, ts_key, ver_key = f"{key}:out", f"{key}:emb", f"{key}:ts", f"{key}:ver"
+        try:
+            if self.similarity and embedding is None:
+                embedding = await _embed(text)
+            redis = _get_redis()
+            now = time.time()
+            entry_id = _entry_id(text)
+
+            pipe = redis.pipeline(transaction=False)
+            pipe.hset(out_key, entry_id, json.dumps({"output": output, "created_at": now}, ensure_ascii=False))
+            pipe.zadd(ts_key, {entry_id: now})
+            if self.similarity:
+                pipe.hset(emb_key, entry_id, embedding.astype(np.float32, copy=False).tobytes())
+                pipe.incr(ver_key)
+            await pipe.execute()
+
+            # 期限切れと上限超過のエントリを古い順に削除
+            stale = await redis.zrangebyscore(ts_key, "-inf", now - self.ttl_seconds)
+            overflow = await redis.zcard(ts_key) - len(stale) - _MAX_ENTRIES
+            if overflow > 0:
+                stale += await redis.zrange(ts_key, len(stale), len(stale) + overflow - 1)
+
+            pipe = redis.pipeline(transaction=False)
+            if stale:
+                pipe.zrem(ts_key, *stale)
+                pipe.hdel(out_key, *stale)
+                if self.similarity:
+                    pipe.hdel(emb_key, *stale)
+                    pipe.incr(ver_key)
+            for k in (out_key, emb_key, ts_key, ver_key):
+                pipe.expire(k, self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            self._handle_error(e)
@@ -83,6 +83,10 @@ class TwoAxisQualityState(TypedDict):
     is_acceptable: bool
 
 
+# 改善タスク化・高優先度扱いの対象となる重要度
+_SEVERE = frozenset({"critical", "high"})
+
+
 # ======================
 # 評価サービス
 # ======================
@@ -298,16 +302,24 @@ class DomainCompletenessEvaluator(BaseService):
                 return func
         return None
     
-    async def evaluate_domain_completeness(self, tasks: List[Dict[str, Any]], functions: List[Dict[str, Any]]) -> QualityEvaluationResult:
-        """ドメインの完結性を評価"""
+    async def evaluate_domain_completeness(
+        self,
+        tasks: List[Dict[str, Any]],
+        functions: List[Dict[str, Any]],
+        domains: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    ) -> QualityEvaluationResult:
+        """ドメインの完結性を評価（domains: 事前に group_by_function_id したもの）"""
         import time
         start_time = time.time()
         
-        domains = self.group_by_function_id(tasks)
+        if domains is None:
+            domains = self.group_by_function_id(tasks)
+        # 機能ごとの線形探索を避けるため function_id で引ける辞書を1回だけ作る
+        functions_by_id = {func.get("function_id"): func for func in reversed(functions)}
         issues = []
         
         for function_id, domain_tasks in domains.items():
-            function = self.get_function_by_id(functions, function_id)
+            function = functions_by_id.get(function_id)
             if function:
                 domain_issues = await self.check_domain_completeness(domain_tasks, function)
                 issues.extend(domain_issues)
@@ -434,11 +446,14 @@ class TaskQualityEvaluationService(BaseService):
         メモリ上のタスクを評価（DB読み込みなし）
         統合サービスから呼ばれる
         """
+        # 機能別のタスク索引は評価前に1度だけ作成して渡す
+        domains = self.domain_evaluator.group_by_function_id(tasks)
+
         # 2軸並列評価
-        layer_result, domain_result = await asyncio.gather(
-            self.layer_evaluator.evaluate_layer_consistency(tasks),
-            self.domain_evaluator.evaluate_domain_completeness(tasks, functions)
-        )
+        async with asyncio.TaskGroup() as tg:
+            layer_task = tg.create_task(self.layer_evaluator.evaluate_layer_consistency(tasks))
+            domain_task = tg.create_task(self.domain_evaluator.evaluate_domain_completeness(tasks, functions, domains))
+        layer_result, domain_result = layer_task.result(), domain_task.result()
         
         # 結果統合
         all_issues = layer_result.issues + domain_result.issues
@@ -460,21 +475,19 @@ class TaskQualityEvaluationService(BaseService):
     
     def _generate_improvement_tasks(self, issues: List[QualityIssue]) -> List[Dict[str, Any]]:
         """品質問題から改善タスクを生成"""
-        improvement_tasks = []
-        
-        for issue in issues:
-            if issue.severity in ["critical", "high"]:
-                improvement_tasks.append({
-                    "title": issue.suggested_action,
-                    "description": f"品質改善: {issue.description}",
-                    "category": issue.category or "その他",
-                    "priority": "Must" if issue.severity == "critical" else "Should",
-                    "estimated_hours": 2.0,
-                    "function_id": issue.function_id,
-                    "is_quality_improvement": True
-                })
-        
-        return improvement_tasks
+        return [
+            {
+                "title": issue.suggested_action,
+                "description": f"品質改善: {issue.description}",
+                "category": issue.category or "その他",
+                "priority": "Must" if issue.severity == "critical" else "Should",
+                "estimated_hours": 2.0,
+                "function_id": issue.function_id,
+                "is_quality_improvement": True
+            }
+            for issue in issues
+            if issue.severity in _SEVERE
+        ]
     
     def tasks_to_dict_list(self, tasks: List[Task]) -> List[Dict[str, Any]]:
         """TaskオブジェクトをDict形式に変換"""
@@ -563,10 +576,10 @@ class TaskQualityEvaluationService(BaseService):
         print(f"並列評価開始 - プロジェクト: {state['project_id']}")
         
         # 2軸並列評価
-        layer_result, domain_result = await asyncio.gather(
-            self.layer_evaluator.evaluate_layer_consistency(state["current_tasks"]),
-            self.domain_evaluator.evaluate_domain_completeness(state["current_tasks"], state["functions"])
-        )
+        async with asyncio.TaskGroup() as tg:
+            layer_task = tg.create_task(self.layer_evaluator.evaluate_layer_consistency(state["current_tasks"]))
+            domain_task = tg.create_task(self.domain_evaluator.evaluate_domain_completeness(state["current_tasks"], state["functions"]))
+        layer_result, domain_result = layer_task.result(), domain_task.result()
         
         # 結果を状態に反映
         state["layer_issues"] = [issue.dict() for issue in layer_result.issues]
@@ -602,7 +615,7 @@ class TaskQualityEvaluationService(BaseService):
         consolidated_issues = [QualityIssue(**issue_dict) for issue_dict in state["consolidated_issues"]]
         
         # 重要度別に分類
-        high_priority = [i for i in consolidated_issues if i.severity in ["critical", "high"]]
+        high_priority = [i for i in consolidated_issues if i.severity in _SEVERE]
         medium_priority = [i for i in consolidated_issues if i.severity == "medium"]
         
         state["high_priority_issues"] = [issue.dict() for issue in high_priority]
@@ -711,7 +724,7 @@ class TaskQualityEvaluationService(BaseService):
                     "title": f"修正タスク: {issue.suggested_action}",
                     "description": issue.suggested_action,
                     "category": issue.category or "その他",
-                    "priority": "高" if issue.severity in ["critical", "high"] else "中",
+                    "priority": "高" if issue.severity in _SEVERE else "中",
                     "function_id": issue.function_id
                 }
             )
@@ -722,15 +735,11 @@ class TaskQualityEvaluationService(BaseService):
     
     def _apply_modifications_to_tasks(self, current_tasks: List[Dict[str, Any]], modifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """修正を現在のタスクに適用"""
-        updated_tasks = current_tasks.copy()
-        
-        for mod_dict in modifications:
-            mod = TaskModification(**mod_dict)
-            if mod.type == "add_task" and mod.new_task_data:
-                # 新しいタスクを追加
-                new_task = mod.new_task_data.copy()
-                new_task["task_id"] = f"generated_{mod.modification_id}"
-                updated_tasks.append(new_task)
-        
-        return updated_tasks
+        # 参照するのは type / new_task_data / modification_id のみなので、
+        # TaskModification への再検証は行わず dict のまま追加分を組み立てる
+        return current_tasks + [
+            {**mod["new_task_data"], "task_id": f"generated_{mod.get('modification_id', '')}"}
+            for mod in modifications
+            if mod.get("type") == "add_task" and mod.get("new_task_data")
+        ]
     
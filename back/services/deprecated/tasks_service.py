@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import functools
 import json
 import uuid
 from typing import Dict, List, Literal, Sequence
 
+from langchain_core.messages import BaseMessage
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field, ValidationError
@@ -30,6 +32,37 @@ class GeneratedTaskList(BaseModel):
     tasks: List[GeneratedTask]
 
 
+@functools.singledispatch
+def _extract_response_text(raw_response) -> str:
+    """LangChainの出力から本文を取り出す。型ごとの分岐はsingledispatchに任せる。"""
+
+    content = getattr(raw_response, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, Sequence):
+        # e.g. list[BaseMessageChunk]
+        return "".join(str(part) for part in content)
+    return str(raw_response)
+
+
+@_extract_response_text.register(type(None))
+def _(raw_response: None) -> str:
+    return ""
+
+
+@_extract_response_text.register(str)
+def _(raw_response: str) -> str:
+    return raw_response
+
+
+@_extract_response_text.register(BaseMessage)
+def _(raw_response: BaseMessage) -> str:
+    content = raw_response.content
+    if isinstance(content, str):
+        return content
+    return "".join(str(part) for part in content)
+
+
 class TasksService(BaseService):
     """仕様情報からタスクリストを生成し、必要に応じてDBへ保存するサービス。"""
 
@@ -93,17 +126,7 @@ class TasksService(BaseService):
     def _extract_text(raw_response) -> str:
         """LangChainの出力が文字列/AIMessageなど異なる場合に備えたラッパー。"""
 
-        if raw_response is None:
-            return ""
-        if isinstance(raw_response, str):
-            return raw_response
-        content = getattr(raw_response, "content", None)
-        if isinstance(content, str):
-            return content
-        if isinstance(content, Sequence):
-            # e.g. list[BaseMessageChunk]
-            return "".join(str(part) for part in content)
-        return str(raw_response)
+        return _extract_response_text(raw_response)
 
     def _persist_tasks(
         self,
@@ -168,12 +168,13 @@ class FunctionService(BaseService):
         """
         self.logger.debug(f"Generating clarification questions for {len(requirements)} low-confidence requirements")
 
-        requirements_text = ""
-        for req in requirements:
-            requirements_text += f"- ID: {req.get('requirement_id')}\n"
-            requirements_text += f"  タイトル: {req.get('title')}\n"
-            requirements_text += f"  説明: {req.get('description')}\n"
-            requirements_text += f"  確信度: {req.get('confidence_level')}\n\n"
+        requirements_text = "".join(
+            f"- ID: {req.get('requirement_id')}\n"
+            f"  タイトル: {req.get('title')}\n"
+            f"  説明: {req.get('description')}\n"
+            f"  確信度: {req.get('confidence_level')}\n\n"
+            for req in requirements
+        )
 
         response_schemas = [
             ResponseSchema(
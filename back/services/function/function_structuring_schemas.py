@@ -420,13 +420,17 @@ def structured_to_db(
 
     Returns:
         DB保存用のモデル
+
+    Raises:
+        ValidationError: function_code / order_index / source_doc_id が不正な場合
     """
+    # structured は use_enum_values により category / priority を文字列で保持している
     return StructuredFunctionDB(
         function_code=function_code,
         function_name=structured.function_name,
         description=structured.description,
-        category=structured.category.value if isinstance(structured.category, Enum) else structured.category,
-        priority=structured.priority.value if isinstance(structured.priority, Enum) else structured.priority,
+        category=structured.category,
+        priority=structured.priority,
         extraction_confidence=structured.confidence,
         order_index=order_index,
         source_doc_id=source_doc_id
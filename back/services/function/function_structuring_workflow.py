@@ -31,6 +31,8 @@ from .function_structuring_schemas import (
 )
 from models.project_base import StructuredFunction, FunctionDependency, ProjectDocument, ProjectBase
 
+# Context Cache 経由の抽出で渡すレスポンススキーマ（model_json_schema は呼ぶたびに再生成されるため一度だけ構築）
+_EXTRACTION_RESPONSE_SCHEMA = FunctionExtractionOutput.model_json_schema()
 
 class FunctionStructuringWorkflow:
     """
@@ -211,11 +213,31 @@ class FunctionStructuringWorkflow:
             state["cache_name"] = None
             return state
 
+    @staticmethod
+    def _run_async(coro):
+        """
+        同期ノードからコルーチンを実行する
+
+        asyncio.run はループを毎回作り直して閉じるため、非同期LLMクライアント（gRPC）の
+        接続もノードごとに張り直しになる。スレッドのイベントループを使い回して接続を再利用する。
+        """
+        try:
+            loop = asyncio.get_event_loop()
+            if loop.is_closed():
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+        except RuntimeError:
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+
+        # loop.close()は呼ばない - gRPCのクリーンアップが後で走るため
+        return loop.run_until_complete(coro)
+
     def _parallel_extraction_node(self, state: GlobalState) -> GlobalState:
         """
         並列抽出ノード（同期ラッパー）
         """
-        return asyncio.run(self._parallel_extraction_node_async(state))
+        return self._run_async(self._parallel_extraction_node_async(state))
 
     async def _parallel_extraction_node_async(self, state: GlobalState) -> GlobalState:
         """
@@ -373,16 +395,7 @@ class FunctionStructuringWorkflow:
             context = {"project": state["constraints"], "technology": state.get("technology", {})}
 
             # asyncio.gather で真の並列実行（非同期関数を直接呼び出し）
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            categorized, prioritized, dependencies = loop.run_until_complete(
+            categorized, prioritized, dependencies = self._run_async(
                 asyncio.gather(
                     self._categorize_functions(functions, context),
                     self._assign_priorities(functions, context),
@@ -390,8 +403,6 @@ class FunctionStructuringWorkflow:
                 )
             )
 
-            # loop.close()は呼ばない - gRPCのクリーンアップが後で走るため
-
             # prioritized が最終結果（category, priority 両方含む）
             state["all_functions"] = prioritized
             state["all_dependencies"] = dependencies
@@ -1060,7 +1071,7 @@ REJECTの場合は、retry_instructionに具体的な修正指示を含めてく
                 result_dict = self._invoke_with_cache(
                     cache_name=cache_name,
                     prompt=prompt_text,
-                    response_schema=FunctionExtractionOutput.model_json_schema()
+                    response_schema=_EXTRACTION_RESPONSE_SCHEMA
                 )
                 if not result_dict:
                     self.logger.error(f"[EXTRACT] Cache invocation returned None")
@@ -8,6 +8,8 @@ InteractiveHandsOnAgent - メインオーケストレータ
 from typing import Dict, Any, AsyncGenerator, Optional, List
 from uuid import UUID
 
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -250,22 +252,33 @@ class HandsOnAgent:
         Returns:
             TaskHandsOnレコード
         """
-        from datetime import datetime
-
         # 既存のTaskHandsOnを取得または作成
         hands_on = self.db.query(TaskHandsOn).filter(
             TaskHandsOn.task_id == self.task.task_id
         ).first()
 
         if not hands_on:
-            hands_on = TaskHandsOn(
+            values = dict(
                 task_id=self.task.task_id,
                 generation_state=state,
                 generation_mode="interactive",
                 session_id=session.session_id,
                 generation_model=self.config.get("model", "gemini-2.0-flash"),
             )
-            self.db.add(hands_on)
+            if self.db.get_bind().dialect.name == "postgresql":
+                # 同じタスクの保存が並行しても一意制約違反にならないよう、
+                # 作成は ON CONFLICT DO NOTHING で行い、勝った側の行を読み直す
+                self.db.execute(
+                    pg_insert(TaskHandsOn)
+                    .values(**values)
+                    .on_conflict_do_nothing(index_elements=[TaskHandsOn.task_id])
+                )
+                hands_on = self.db.query(TaskHandsOn).filter(
+                    TaskHandsOn.task_id == self.task.task_id
+                ).one()
+            else:
+                hands_on = TaskHandsOn(**values)
+                self.db.add(hands_on)
 
         # 生成済みコンテンツを各カラムに保存
         hands_on.overview = session.generated_content.get("overview", "")
@@ -283,7 +296,8 @@ class HandsOnAgent:
         # user_interactionsに詳細情報を保存
         hands_on.user_interactions = build_user_interactions(session)
 
-        hands_on.updated_at = datetime.now()
+        # 更新時刻はDB側で付与する（Python側で日時を生成・整形しない）
+        hands_on.updated_at = func.now()
 
         self.db.commit()
         self.db.refresh(hands_on)
@@ -19,6 +19,16 @@ class AIDocumentService(BaseService):
 
     def __init__(self, db: Session):
         super().__init__(db=db)
+        # サービスはリクエストごとに生成されるため、同一リクエスト内のAIDocument取得をキャッシュする
+        self._ai_document_cache: Dict[uuid.UUID, Optional[AIDocument]] = {}
+
+    def _get_ai_document_row(self, project_uuid: uuid.UUID) -> Optional[AIDocument]:
+        """AIDocumentの行を取得（リクエスト内キャッシュ付き）"""
+        if project_uuid not in self._ai_document_cache:
+            self._ai_document_cache[project_uuid] = self.db.query(AIDocument).filter(
+                AIDocument.project_id == project_uuid
+            ).first()
+        return self._ai_document_cache[project_uuid]
 
     async def generate_ai_document_from_framework(self, project_id: str) -> dict:
         """
@@ -51,9 +61,7 @@ class AIDocumentService(BaseService):
             )
 
             # 既存のAIDocumentを取得または新規作成
-            ai_document = self.db.query(AIDocument).filter(
-                AIDocument.project_id == project_uuid
-            ).first()
+            ai_document = self._get_ai_document_row(project_uuid)
 
             if ai_document:
                 # 既存レコードを更新
@@ -76,19 +84,23 @@ class AIDocumentService(BaseService):
                 )
                 self.db.add(ai_document)
 
+            # flushで主キーが確定するので、commit後のrefresh(再SELECT)は行わない
+            self.db.flush()
+            ai_doc_id = str(ai_document.ai_doc_id)
             self.db.commit()
-            self.db.refresh(ai_document)
+            self._ai_document_cache[project_uuid] = ai_document
 
             return {
                 "success": True,
                 "project_id": project_id,
-                "ai_doc_id": str(ai_document.ai_doc_id),
+                "ai_doc_id": ai_doc_id,
                 "generated_documents": ai_docs,
                 "message": "AIドキュメントが正常に生成されました"
             }
 
         except Exception as e:
             self.db.rollback()
+            self._ai_document_cache.clear()
             raise ValueError(f"AIドキュメント生成エラー: {str(e)}")
 
     async def _generate_categorized_documents(
@@ -324,9 +336,7 @@ class AIDocumentService(BaseService):
         """
         try:
             project_uuid = uuid.UUID(project_id)
-            ai_doc = self.db.query(AIDocument).filter(
-                AIDocument.project_id == project_uuid
-            ).first()
+            ai_doc = self._get_ai_document_row(project_uuid)
 
             if not ai_doc:
                 return None
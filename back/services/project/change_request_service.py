@@ -941,7 +941,7 @@ class ChangeRequestService(BaseService):
             deleted_count = self.db.query(TaskHandsOn).filter(
                 TaskHandsOn.task_id.in_(target_task_ids)
             ).delete(synchronize_session=False)
-            print(f"[ChangeRequest] 既存ハンズオン削除: {deleted_count} 件（インタラクティブモードで再生成）")
+            self.logger.info("既存ハンズオン削除: %s 件（インタラクティブモードで再生成）", deleted_count)
 
         self.db.commit()
 
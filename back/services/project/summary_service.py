@@ -54,6 +54,7 @@ class SummaryService(BaseService):
     def __init__(self,db: Session):
         super().__init__(db=db)
         self._cache = {}  # project_id -> (summary_snapshot, qa_snapshot, cache_name)
+        self._project_document_cache: Dict[uuid.UUID, Optional[ProjectDocument]] = {}
         # 仕様書評価にはthinkingを使用（非ストリーミング処理）
         self.llm_with_thinking = self._load_llm(
             self.default_model_provider, "gemini-2.5-flash", thinking_budget=None
@@ -65,6 +66,14 @@ class SummaryService(BaseService):
             self.genai_client = None
             self.logger.warning("Google GenAI SDK not installed. Context caching will be unavailable.")
 
+    def _get_project_document(self, project_uuid: uuid.UUID) -> Optional[ProjectDocument]:
+        """ProjectDocumentの行を取得（リクエスト内キャッシュ付き）"""
+        if project_uuid not in self._project_document_cache:
+            self._project_document_cache[project_uuid] = self.db.query(ProjectDocument).filter(
+                ProjectDocument.project_id == project_uuid
+            ).first()
+        return self._project_document_cache[project_uuid]
+
     async def generate_summary_from_qa_list(self, question_answer: List[Union[dict, BaseModel]]) -> str:
         """
         ユーザーのQ&A回答リストから要約を生成する（保存は行わない）。
@@ -77,7 +86,7 @@ class SummaryService(BaseService):
         Returns:
             str: 生成された要約文字列
         """
-        question_answer_str = ""
+        qa_lines = []
         for item in question_answer:
             if hasattr(item, 'dict'):
                 data = item.dict()
@@ -88,9 +97,9 @@ class SummaryService(BaseService):
             a = data.get('Answer') or data.get('answer')
 
             if q and a:
-                question_answer_str += f"Q: {q}\nA: {a}\n"
+                qa_lines.append(f"Q: {q}\nA: {a}\n")
 
-        question_answer_str = question_answer_str.strip()
+        question_answer_str = "".join(qa_lines).strip()
 
         summary_system_prompt = ChatPromptTemplate.from_template(
             template=self.get_prompt("summary_service", "generate_summary_document")
@@ -136,9 +145,7 @@ class SummaryService(BaseService):
         project_uuid = uuid.UUID(project_id) if isinstance(project_id, str) else project_id
 
         # 既存の仕様書があるかチェック
-        existing_doc = self.db.query(ProjectDocument).filter(
-            ProjectDocument.project_id == project_uuid
-        ).first()
+        existing_doc = self._get_project_document(project_uuid)
 
         if existing_doc and existing_doc.specification:
             # 既存仕様書がある場合：差分ベースで更新
@@ -164,7 +171,7 @@ class SummaryService(BaseService):
             summary = await self.generate_summary(project_id)
 
         # 要約をDBに保存
-        saved_doc = self.save_summary_to_project_document(project_uuid, summary)
+        saved_doc_id = self.save_summary_to_project_document(project_uuid, summary)
 
         # 仕様書フィードバックを生成
         try:
@@ -186,13 +193,13 @@ class SummaryService(BaseService):
 
         return {
             "summary": summary,
-            "doc_id": str(saved_doc.doc_id),
+            "doc_id": str(saved_doc_id),
             "specification_feedback": specification_feedback
         }
         
     
     
-    def save_summary_to_project_document(self, project_id: uuid.UUID, summary: str) -> ProjectDocument:
+    def save_summary_to_project_document(self, project_id: uuid.UUID, summary: str) -> uuid.UUID:
         """
         生成された要約をプロジェクトドキュメントに保存する。
         
@@ -201,16 +208,17 @@ class SummaryService(BaseService):
             summary: 保存する要約文字列
             
         Returns:
-            ProjectDocument: 保存されたプロジェクトドキュメント
+            uuid.UUID: 保存されたプロジェクトドキュメントの doc_id
+            （commit前に読み取るため、commit後の再SELECTは発生しない）
         """
         # DBにすでにあるかを確認する
-        existing_doc = self.db.query(ProjectDocument).filter(ProjectDocument.project_id == project_id).first()
+        existing_doc = self._get_project_document(project_id)
         if existing_doc:
             # すでにある場合は更新する
             existing_doc.specification = summary
+            doc_id = existing_doc.doc_id
             self.db.commit()
-            self.db.refresh(existing_doc)
-            return existing_doc
+            return doc_id
         else:
             # DBに保存する
             new_doc = ProjectDocument(
@@ -222,9 +230,10 @@ class SummaryService(BaseService):
                 directory_info=""
             )
             self.db.add(new_doc)
+            doc_id = new_doc.doc_id
             self.db.commit()
-            self.db.refresh(new_doc)
-            return new_doc
+            self._project_document_cache[project_id] = new_doc
+            return doc_id
 
     async def generate_confidence_feedback(self, project_id: str) -> Dict[str, Any]:
         """
@@ -241,9 +250,7 @@ class SummaryService(BaseService):
 
         # プロジェクトドキュメント（仕様書）を取得
         project_uuid = uuid.UUID(project_id) if isinstance(project_id, str) else project_id
-        project_doc = self.db.query(ProjectDocument).filter(
-            ProjectDocument.project_id == project_uuid
-        ).first()
+        project_doc = self._get_project_document(project_uuid)
 
         if not project_doc or not project_doc.specification:
             raise ValueError(f"No specification found for project_id: {project_id}")
@@ -281,9 +288,7 @@ class SummaryService(BaseService):
         project_uuid = uuid.UUID(project_id) if isinstance(project_id, str) else project_id
 
         # DBから現在の仕様書を取得
-        project_doc = self.db.query(ProjectDocument).filter(
-            ProjectDocument.project_id == project_uuid
-        ).first()
+        project_doc = self._get_project_document(project_uuid)
 
         if not project_doc or not project_doc.specification:
             return None
@@ -394,9 +399,7 @@ class SummaryService(BaseService):
         project_uuid = uuid.UUID(project_id) if isinstance(project_id, str) else project_id
 
         # 既存の仕様書を取得
-        project_doc = self.db.query(ProjectDocument).filter(
-            ProjectDocument.project_id == project_uuid
-        ).first()
+        project_doc = self._get_project_document(project_uuid)
 
         if not project_doc or not project_doc.specification:
             raise ValueError(f"No specification found for project_id: {project_id}")
@@ -406,15 +409,16 @@ class SummaryService(BaseService):
             return project_doc.specification
 
         # 差分情報を構築
-        diff_info = ""
+        diff_parts = []
 
         if manual_diff:
-            diff_info += f"## 手動編集による変更:\n{manual_diff}\n\n"
+            diff_parts.append(f"## 手動編集による変更:\n{manual_diff}\n\n")
 
         if new_qa and len(new_qa) > 0:
-            diff_info += "## 新規Q&A:\n"
-            for qa in new_qa:
-                diff_info += f"Q: {qa.question}\nA: {qa.answer or '未回答'}\n\n"
+            diff_parts.append("## 新規Q&A:\n")
+            diff_parts.extend(f"Q: {qa.question}\nA: {qa.answer or '未回答'}\n\n" for qa in new_qa)
+
+        diff_info = "".join(diff_parts)
 
         # プロンプトで差分更新を指示
         prompt_text = f"""
@@ -464,9 +468,7 @@ class SummaryService(BaseService):
         project_uuid = uuid.UUID(project_id) if isinstance(project_id, str) else project_id
 
         # 既存の仕様書を取得
-        project_doc = self.db.query(ProjectDocument).filter(
-            ProjectDocument.project_id == project_uuid
-        ).first()
+        project_doc = self._get_project_document(project_uuid)
 
         if not project_doc or not project_doc.specification:
             raise ValueError(f"No specification found for project_id: {project_id}")
@@ -519,16 +521,16 @@ class SummaryService(BaseService):
                 self.logger.info(f"既存キャッシュを使用: {cached_content_name}")
 
             # 差分情報を構築
-            diff_prompt = ""
+            diff_parts = []
             if manual_diff:
-                diff_prompt += f"## 手動編集による変更:\n{manual_diff}\n\n"
+                diff_parts.append(f"## 手動編集による変更:\n{manual_diff}\n\n")
 
             if new_qa and len(new_qa) > 0:
-                diff_prompt += "## 新規Q&A:\n"
-                for qa in new_qa:
-                    diff_prompt += f"Q: {qa.question}\nA: {qa.answer or '未回答'}\n\n"
+                diff_parts.append("## 新規Q&A:\n")
+                diff_parts.extend(f"Q: {qa.question}\nA: {qa.answer or '未回答'}\n\n" for qa in new_qa)
 
-            diff_prompt += "\n更新された仕様書を出力してください。"
+            diff_parts.append("\n更新された仕様書を出力してください。")
+            diff_prompt = "".join(diff_parts)
 
             # キャッシュを使用してコンテンツ生成
             response = self.genai_client.models.generate_content(
@@ -588,11 +590,11 @@ class SummaryService(BaseService):
                 return
 
             # Q&Aを文字列にフォーマット
-            question_answer_str = ""
-            for qa in qa_list:
-                if qa.question and qa.answer:
-                    question_answer_str += f"Q: {qa.question}\nA: {qa.answer}\n"
-            question_answer_str = question_answer_str.strip()
+            question_answer_str = "".join(
+                f"Q: {qa.question}\nA: {qa.answer}\n"
+                for qa in qa_list
+                if qa.question and qa.answer
+            ).strip()
 
             # プロンプトとチェーンを構築
             summary_system_prompt = ChatPromptTemplate.from_template(
@@ -609,9 +611,9 @@ class SummaryService(BaseService):
                     yield sse_event("chunk", {"text": text})
 
             # 仕様書をDBに保存
-            saved_doc = self.save_summary_to_project_document(project_uuid, full_summary)
+            saved_doc_id = self.save_summary_to_project_document(project_uuid, full_summary)
             yield sse_event("spec_done", {
-                "doc_id": str(saved_doc.doc_id),
+                "doc_id": str(saved_doc_id),
                 "summary": full_summary,
             })
 
@@ -78,29 +78,29 @@ class CompleteTaskGenerationService(BaseService):
         
         try:
             # Phase 1: タスク生成（メモリ上）
-            print(f"Phase 1: タスク生成開始 - プロジェクト: {project_id}")
+            self.logger.info("Phase 1: タスク生成開始 - プロジェクト: %s", project_id)
             generated_tasks = await self._generate_tasks_in_memory(project_id)
-            print(f"  生成タスク数: {len(generated_tasks)}")
+            self.logger.info("  生成タスク数: %s", len(generated_tasks))
             
             # Phase 2: 品質評価・改善（メモリ上）
-            print("Phase 2: 品質評価・改善開始")
+            self.logger.info("Phase 2: 品質評価・改善開始")
             improved_tasks = await self._evaluate_and_improve_tasks(generated_tasks, project_id)
-            print(f"  改善後タスク数: {len(improved_tasks)}")
+            self.logger.info("  改善後タスク数: %s", len(improved_tasks))
             
             # Phase 3: 依存関係生成（メモリ上）
-            print("Phase 3: 依存関係生成開始")
+            self.logger.info("Phase 3: 依存関係生成開始")
             tasks_with_dependencies = await self._generate_dependencies(improved_tasks, project_id)
-            print(f"  依存関係生成完了")
+            self.logger.info("  依存関係生成完了")
             
             # Phase 4: 座標計算（メモリ上）
-            print("Phase 4: 座標計算開始")
+            self.logger.info("Phase 4: 座標計算開始")
             complete_tasks, edges = await self._calculate_positions(tasks_with_dependencies)
-            print(f"  座標計算完了 - ノード数: {len(complete_tasks)}, エッジ数: {len(edges)}")
+            self.logger.info("  座標計算完了 - ノード数: %s, エッジ数: %s", len(complete_tasks), len(edges))
             
             # Phase 5: DBに一括保存
-            print("Phase 5: DB保存開始")
+            self.logger.info("Phase 5: DB保存開始")
             saved_task_ids, saved_edge_ids = await self._save_complete_task_set(complete_tasks, edges)
-            print(f"  DB保存完了 - タスク: {len(saved_task_ids)}, 依存関係: {len(saved_edge_ids)}")
+            self.logger.info("  DB保存完了 - タスク: %s, 依存関係: %s", len(saved_task_ids), len(saved_edge_ids))
             
             processing_time = time.time() - start_time
             
@@ -122,7 +122,7 @@ class CompleteTaskGenerationService(BaseService):
             }
             
         except Exception as e:
-            print(f"エラー発生: {str(e)}")
+            self.logger.error("エラー発生: %s", e)
             raise ValueError(f"タスク生成パイプラインでエラー: {str(e)}")
     
     async def _generate_tasks_in_memory(self, project_id: str) -> List[Dict[str, Any]]:
@@ -202,6 +202,7 @@ class CompleteTaskGenerationService(BaseService):
         
         # カテゴリと優先度に基づいて依存関係を決定
         category_order = ["DB設計", "バックエンド", "フロントエンド"]
+        category_index = {cat: i for i, cat in enumerate(category_order)}
         
         # カテゴリでグループ化
         by_category = {}
@@ -217,8 +218,8 @@ class CompleteTaskGenerationService(BaseService):
             task_cat = task.get("category", "その他")
             
             # 現在のカテゴリより前のカテゴリのタスクに依存
-            if task_cat in category_order:
-                cat_idx = category_order.index(task_cat)
+            cat_idx = category_index.get(task_cat)
+            if cat_idx is not None:
                 if cat_idx > 0:
                     # 前のカテゴリの最後のタスクに依存
                     prev_cat = category_order[cat_idx - 1]
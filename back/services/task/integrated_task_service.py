@@ -34,10 +34,10 @@ class IntegratedTaskService(BaseService):
         start_time = time.time()
         
         try:
-            print(f"=== 統合タスク生成開始: プロジェクト {project_id} ===")
+            self.logger.info("=== 統合タスク生成開始: プロジェクト %s ===", project_id)
             
             # Step 1: 基本タスク生成（メモリ上）
-            print("Step 1: 基本タスク生成")
+            self.logger.info("Step 1: 基本タスク生成")
             generated_tasks = await self.task_generator.generate_tasks_in_memory(project_id)
             task_dicts = [task.dict() for task in generated_tasks]
             
@@ -54,11 +54,11 @@ class IntegratedTaskService(BaseService):
                 for func in functions
             ]
             
-            print(f"  生成タスク数: {len(task_dicts)}")
+            self.logger.info("  生成タスク数: %s", len(task_dicts))
             
             # Step 2: 品質評価・改善（無効化）
             # ナイーブなキーワードマッチングによる品質評価は重複タスクを生成するため無効化
-            print("Step 2: 品質評価・改善 (スキップ)")
+            self.logger.info("Step 2: 品質評価・改善 (スキップ)")
             quality_result = {
                 "overall_score": 1.0,
                 "is_acceptable": True,
@@ -67,29 +67,29 @@ class IntegratedTaskService(BaseService):
             improvement_tasks = []
             all_tasks = task_dicts
 
-            print(f"  品質評価: スキップ (重複タスク防止)")
-            print(f"  総タスク数: {len(all_tasks)}")
+            self.logger.info("  品質評価: スキップ (重複タスク防止)")
+            self.logger.info("  総タスク数: %s", len(all_tasks))
             
             # Step 3: 依存関係生成（メモリ上）
-            print("Step 3: 依存関係生成")
+            self.logger.info("Step 3: 依存関係生成")
             tasks_with_deps, edges = await self.dependency_service.generate_dependencies(all_tasks, function_dicts)
             
-            print(f"  依存関係数: {len(edges)}")
+            self.logger.info("  依存関係数: %s", len(edges))
             
             # Step 4: 座標計算（メモリ上）
-            print("Step 4: 座標計算")
+            self.logger.info("Step 4: 座標計算")
             final_tasks = self.position_service.calculate_positions(tasks_with_deps, edges)
             
             # Step 5: DB一括保存
-            print("Step 5: DB一括保存")
+            self.logger.info("Step 5: DB一括保存")
             saved_task_ids, saved_edge_ids = await self._save_complete_data(project_id, final_tasks, edges)
             
             processing_time = time.time() - start_time
             
-            print(f"=== 統合タスク生成完了 ===")
-            print(f"処理時間: {processing_time:.2f}秒")
-            print(f"保存タスク数: {len(saved_task_ids)}")
-            print(f"保存エッジ数: {len(saved_edge_ids)}")
+            self.logger.info("=== 統合タスク生成完了 ===")
+            self.logger.info("処理時間: %.2f秒", processing_time)
+            self.logger.info("保存タスク数: %s", len(saved_task_ids))
+            self.logger.info("保存エッジ数: %s", len(saved_edge_ids))
             
             return {
                 "success": True,
@@ -112,7 +112,7 @@ class IntegratedTaskService(BaseService):
             }
             
         except Exception as e:
-            print(f"統合タスク生成エラー: {str(e)}")
+            self.logger.error("統合タスク生成エラー: %s", e)
             raise ValueError(f"統合タスク生成でエラー: {str(e)}")
     
     async def _save_complete_data(self, project_id: str, tasks: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
@@ -124,7 +124,7 @@ class IntegratedTaskService(BaseService):
         try:
             # Phase 1: タスクを保存
             for task in tasks:
-                print(f"Task function_id: '{task.get('function_id')}' (type: {type(task.get('function_id'))})")  # デバッグ出力
+                self.logger.debug("Task function_id: '%s' (type: %s)", task.get('function_id'), type(task.get('function_id')))  # デバッグ出力
                 task_id = uuid.uuid4()
                 task_id_mapping[task["node_id"]] = task_id
                 
@@ -173,11 +173,11 @@ class IntegratedTaskService(BaseService):
             
             # Phase 3: コミット
             self.db.commit()
-            print(f"DB保存成功: タスク {len(saved_task_ids)}個, エッジ {len(saved_edge_ids)}個")
+            self.logger.info("DB保存成功: タスク %s個, エッジ %s個", len(saved_task_ids), len(saved_edge_ids))
             
         except Exception as e:
             self.db.rollback()
-            print(f"DB保存エラー: {str(e)}")
+            self.logger.error("DB保存エラー: %s", e)
             raise ValueError(f"DB保存エラー: {str(e)}")
         
         return saved_task_ids, saved_edge_ids
@@ -2,6 +2,7 @@
 タスク依存関係生成サービス
 機能内→機能間→全体最適化の3段階アプローチ
 """
+import os
 from typing import List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
 from langchain_core.prompts import ChatPromptTemplate
@@ -11,11 +12,93 @@ import networkx as nx
 from ..core import BaseService
 
 
+# フォールバック依存で使うカテゴリの実装順（カテゴリ → 順位）
+_FALLBACK_CATEGORY_RANK = {
+    category: rank
+    for rank, category in enumerate(["DB設計", "バックエンド", "フロントエンド", "テスト"])
+}
+
+
+_INTRA_FUNCTION_PROMPT = """
+あなたはソフトウェア開発の専門家です。
+以下の機能内のタスクについて、実装の論理的な順序と依存関係を分析してください。
+
+## 機能情報：
+- 機能名: {function_name}
+- 説明: {function_description}
+- カテゴリ: {function_category}
+
+## タスクリスト：
+{task_descriptions}
+
+## 分析の観点：
+1. データベース設計は他のタスクの前提となるか？
+2. バックエンドAPIはフロントエンドの前提となるか？
+3. どのタスクが並行実行可能か？
+4. テストはどのタスクの実装後に可能か？
+
+## 出力形式（JSON）：
+{{
+  "dependencies": [
+    {{
+      "task_node_id": "依存するタスクのnode_id",
+      "depends_on": ["依存先タスクのnode_id"],
+      "reason": "依存理由"
+    }}
+  ],
+  "parallel_groups": [
+    ["並行実行可能なnode_id1", "node_id2"]
+  ]
+}}
+
+重要：
+- 本当に必要な依存関係のみを設定
+- 過度な直列化を避け、並行実行を最大化
+- 論理的な実装順序を重視
+"""
+
+_INTER_FUNCTION_PROMPT = """
+あなたはシステムアーキテクチャの専門家です。
+以下の機能間の依存関係を分析してください。
+
+## 機能リスト：
+{function_descriptions}
+
+## 分析の観点：
+1. 認証機能は他の機能の前提条件か？
+2. データ管理機能はUI機能の前提か？
+3. 基盤となる機能はどれか？
+4. どの機能が独立して開発可能か？
+
+## 出力形式（JSON）：
+{{
+  "function_dependencies": [
+    {{
+      "function_id": "依存する機能ID",
+      "depends_on_functions": ["依存先機能ID"],
+      "dependency_type": "必須|推奨|参考",
+      "reason": "依存理由"
+    }}
+  ]
+}}
+
+重要：
+- 「必須」は本当に前提となる場合のみ
+- 「推奨」は順序があった方が良い場合
+- 過度な依存関係は設定しない
+"""
+
+
 class TaskDependencyService(BaseService):
     """タスク依存関係生成エージェント"""
     
     def __init__(self, db: Session):
         super().__init__(db)
+        # 機能数ぶんのLLM呼び出しを同時に投げるとレート制限(429)に当たりやすいため同時実行数を制限
+        self._llm_sem = asyncio.Semaphore(int(os.getenv("LLM_CONCURRENCY", "4")))
+        # プロンプトは固定なので呼び出しごとに再構築せず初期化時に1度だけ作る
+        self._intra_function_prompt = ChatPromptTemplate.from_template(_INTRA_FUNCTION_PROMPT)
+        self._inter_function_prompt = ChatPromptTemplate.from_template(_INTER_FUNCTION_PROMPT)
     
     async def generate_dependencies(self, tasks: List[Dict[str, Any]], functions: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """
@@ -24,7 +107,7 @@ class TaskDependencyService(BaseService):
         2. 機能間の依存関係分析（LLM）
         3. 全体フロー最適化（ルールベース）
         """
-        print(f"依存関係生成開始: {len(tasks)}個のタスク, {len(functions)}個の機能")
+        self.logger.info("依存関係生成開始: %s個のタスク, %s個の機能", len(tasks), len(functions))
         
         # タスクにnode_idを割り当て
         for i, task in enumerate(tasks):
@@ -45,21 +128,21 @@ class TaskDependencyService(BaseService):
                 orphan_tasks.append(task)
         
         # Phase 1: 機能内タスクの依存関係分析
-        print("Phase 1: 機能内タスクの依存関係分析")
+        self.logger.info("Phase 1: 機能内タスクの依存関係分析")
         await self._analyze_intra_function_dependencies(tasks_by_function, functions)
         
         # Phase 2: 機能間の依存関係分析
-        print("Phase 2: 機能間の依存関係分析")
+        self.logger.info("Phase 2: 機能間の依存関係分析")
         await self._analyze_inter_function_dependencies(tasks_by_function, functions)
         
         # Phase 3: 全体フロー最適化
-        print("Phase 3: 全体フロー最適化")
+        self.logger.info("Phase 3: 全体フロー最適化")
         self._optimize_overall_flow(tasks, orphan_tasks)
         
         # エッジ情報を生成
         edges = self._generate_edges(tasks)
         
-        print(f"依存関係生成完了: {len(edges)}個のエッジ")
+        self.logger.info("依存関係生成完了: %s個のエッジ", len(edges))
         return tasks, edges
     
     async def _analyze_intra_function_dependencies(self, tasks_by_function: Dict[str, List[Dict[str, Any]]], functions: List[Dict[str, Any]]) -> None:
@@ -92,51 +175,14 @@ class TaskDependencyService(BaseService):
         
         task_descriptions = "\n\n".join(task_list)
         
-        prompt = ChatPromptTemplate.from_template("""
-あなたはソフトウェア開発の専門家です。
-以下の機能内のタスクについて、実装の論理的な順序と依存関係を分析してください。
-
-## 機能情報：
-- 機能名: {function_name}
-- 説明: {function_description}
-- カテゴリ: {function_category}
-
-## タスクリスト：
-{task_descriptions}
-
-## 分析の観点：
-1. データベース設計は他のタスクの前提となるか？
-2. バックエンドAPIはフロントエンドの前提となるか？
-3. どのタスクが並行実行可能か？
-4. テストはどのタスクの実装後に可能か？
-
-## 出力形式（JSON）：
-{{
-  "dependencies": [
-    {{
-      "task_node_id": "依存するタスクのnode_id",
-      "depends_on": ["依存先タスクのnode_id"],
-      "reason": "依存理由"
-    }}
-  ],
-  "parallel_groups": [
-    ["並行実行可能なnode_id1", "node_id2"]
-  ]
-}}
-
-重要：
-- 本当に必要な依存関係のみを設定
-- 過度な直列化を避け、並行実行を最大化
-- 論理的な実装順序を重視
-""")
-        
         try:
-            response = await self.llm_pro.ainvoke(prompt.format(
-                function_name=function_info.get("function_name", ""),
-                function_description=function_info.get("description", ""),
-                function_category=function_info.get("category", ""),
-                task_descriptions=task_descriptions
-            ))
+            async with self._llm_sem:
+                response = await self.llm_pro.ainvoke(self._intra_function_prompt.format(
+                    function_name=function_info.get("function_name", ""),
+                    function_description=function_info.get("description", ""),
+                    function_category=function_info.get("category", ""),
+                    task_descriptions=task_descriptions
+                ))
             
             # JSON部分を抽出してパース
             content = response.content
@@ -153,10 +199,10 @@ class TaskDependencyService(BaseService):
                         # 重複削除
                         task["depends_on"] = list(set(task["depends_on"]))
                 
-                print(f"機能内依存関係分析完了: {function_info.get('function_name', 'Unknown')}")
+                self.logger.debug("機能内依存関係分析完了: %s", function_info.get('function_name', 'Unknown'))
         
         except Exception as e:
-            print(f"機能内依存関係分析エラー ({function_info.get('function_name', 'Unknown')}): {e}")
+            self.logger.error("機能内依存関係分析エラー (%s): %s", function_info.get('function_name', 'Unknown'), e)
             # フォールバック：カテゴリベースの依存関係
             self._apply_fallback_intra_dependencies(func_tasks)
     
@@ -164,7 +210,7 @@ class TaskDependencyService(BaseService):
         """Phase 2: 機能間の依存関係をLLMで分析"""
 
         if len(functions) <= 1:
-            print("機能間依存関係スキップ: 機能が1つ以下")
+            self.logger.info("機能間依存関係スキップ: 機能が1つ以下")
             return
         
         # 機能情報を整形
@@ -179,39 +225,8 @@ class TaskDependencyService(BaseService):
         
         function_descriptions = "\n\n".join(function_list)
         
-        prompt = ChatPromptTemplate.from_template("""
-あなたはシステムアーキテクチャの専門家です。
-以下の機能間の依存関係を分析してください。
-
-## 機能リスト：
-{function_descriptions}
-
-## 分析の観点：
-1. 認証機能は他の機能の前提条件か？
-2. データ管理機能はUI機能の前提か？
-3. 基盤となる機能はどれか？
-4. どの機能が独立して開発可能か？
-
-## 出力形式（JSON）：
-{{
-  "function_dependencies": [
-    {{
-      "function_id": "依存する機能ID",
-      "depends_on_functions": ["依存先機能ID"],
-      "dependency_type": "必須|推奨|参考",
-      "reason": "依存理由"
-    }}
-  ]
-}}
-
-重要：
-- 「必須」は本当に前提となる場合のみ
-- 「推奨」は順序があった方が良い場合
-- 過度な依存関係は設定しない
-""")
-        
         try:
-            response = await self.llm_pro.ainvoke(prompt.format(
+            response = await self.llm_pro.ainvoke(self._inter_function_prompt.format(
                 function_descriptions=function_descriptions
             ))
             
@@ -227,7 +242,7 @@ class TaskDependencyService(BaseService):
                     depends_on_func_ids = func_dep["depends_on_functions"]
                     dependency_type = func_dep.get("dependency_type", "必須")
 
-                    print(f"機能間依存: {dependent_func_id} -> {depends_on_func_ids} (タイプ: {dependency_type})")
+                    self.logger.debug("機能間依存: %s -> %s (タイプ: %s)", dependent_func_id, depends_on_func_ids, dependency_type)
 
                     # 「必須」の依存関係のみを適用
                     if dependency_type == "必須" and dependent_func_id in tasks_by_function:
@@ -242,18 +257,18 @@ class TaskDependencyService(BaseService):
                                     first_dependent = min(dependent_tasks, key=lambda t: len(t.get("depends_on", [])))
                                     last_prerequisite = max(prerequisite_tasks, key=lambda t: len(t.get("depends_on", [])))
 
-                                    print(f"  タスク依存追加: {first_dependent['node_id']} (依存数: {len(first_dependent.get('depends_on', []))}) <- {last_prerequisite['node_id']} (依存数: {len(last_prerequisite.get('depends_on', []))})")
+                                    self.logger.debug("  タスク依存追加: %s (依存数: %s) <- %s (依存数: %s)", first_dependent['node_id'], len(first_dependent.get('depends_on', [])), last_prerequisite['node_id'], len(last_prerequisite.get('depends_on', [])))
 
                                     if last_prerequisite["node_id"] not in first_dependent["depends_on"]:
                                         first_dependent["depends_on"].append(last_prerequisite["node_id"])
-                                        print(f"  ✓ 追加成功 (新しい依存数: {len(first_dependent['depends_on'])})")
+                                        self.logger.debug("  ✓ 追加成功 (新しい依存数: %s)", len(first_dependent['depends_on']))
                                     else:
-                                        print(f"  - 既に存在（スキップ）")
+                                        self.logger.debug("  - 既に存在（スキップ）")
                 
-                print("機能間依存関係分析完了")
+                self.logger.info("機能間依存関係分析完了")
         
         except Exception as e:
-            print(f"機能間依存関係分析エラー: {e}")
+            self.logger.error("機能間依存関係分析エラー: %s", e)
     
     def _optimize_overall_flow(self, tasks: List[Dict[str, Any]], orphan_tasks: List[Dict[str, Any]]) -> None:
         """Phase 3: 全体フローを最適化"""
@@ -267,7 +282,7 @@ class TaskDependencyService(BaseService):
         # 不要な推移的依存関係を削除
         self._remove_transitive_dependencies(tasks)
         
-        print("全体フロー最適化完了")
+        self.logger.info("全体フロー最適化完了")
     
     def _handle_orphan_tasks(self, orphan_tasks: List[Dict[str, Any]], all_tasks: List[Dict[str, Any]]) -> None:
         """機能に属さないタスクの依存関係を設定"""
@@ -300,7 +315,7 @@ class TaskDependencyService(BaseService):
     
     def _remove_circular_dependencies(self, tasks: List[Dict[str, Any]]) -> None:
         """networkxを使用した循環依存の検出・削除"""
-        print("循環依存チェック開始")
+        self.logger.info("循環依存チェック開始")
         # グラフ構築
         G = nx.DiGraph()
 
@@ -313,15 +328,15 @@ class TaskDependencyService(BaseService):
                 G.add_edge(dep_id, node_id)  # 依存先 -> 依存元
                 edge_count += 1
 
-        print(f"グラフ構築完了: {len(G.nodes)}ノード, {edge_count}エッジ")
+        self.logger.info("グラフ構築完了: %sノード, %sエッジ", len(G.nodes), edge_count)
 
         # 循環依存検出と削除
         try:
             cycles = list(nx.simple_cycles(G))
             if cycles:
-                print(f"⚠️ 循環依存を検出: {len(cycles)}個のサイクル")
+                self.logger.warning("⚠️ 循環依存を検出: %s個のサイクル", len(cycles))
                 for i, cycle in enumerate(cycles[:5]):  # 最初の5つを表示
-                    print(f"  サイクル {i+1}: {' -> '.join(cycle)} -> {cycle[0]}")
+                    self.logger.debug("  サイクル %s: %s -> %s", i+1, ' -> '.join(cycle), cycle[0])
                 
                 # 各サイクルの最小重要度のエッジを削除
                 for cycle in cycles:
@@ -336,21 +351,21 @@ class TaskDependencyService(BaseService):
                         # 最初のエッジを削除（簡単な解決策）
                         if edges_to_remove:
                             from_node, to_node = edges_to_remove[0]
-                            print(f"  循環解決: {from_node} -> {to_node} を削除")
+                            self.logger.debug("  循環解決: %s -> %s を削除", from_node, to_node)
 
                             # タスクの依存関係から削除
                             for task in tasks:
                                 if task["node_id"] == to_node:
                                     if from_node in task.get("depends_on", []):
                                         task["depends_on"].remove(from_node)
-                                        print(f"  ✓ 削除成功")
+                                        self.logger.debug("  ✓ 削除成功")
                                     break
 
-                print(f"循環依存除去完了: {len(cycles)}個のサイクルを解決")
+                self.logger.info("循環依存除去完了: %s個のサイクルを解決", len(cycles))
             else:
-                print("✓ 循環依存なし")
+                self.logger.info("✓ 循環依存なし")
         except Exception as e:
-            print(f"❌ 循環依存検出エラー: {e}")
+            self.logger.error("❌ 循環依存検出エラー: %s", e)
     
     def _remove_transitive_dependencies(self, tasks: List[Dict[str, Any]]) -> None:
         """networkxを使用した推移的依存関係の削除"""
@@ -375,14 +390,12 @@ class TaskDependencyService(BaseService):
                 task["depends_on"] = new_deps
                 
         except Exception as e:
-            print(f"推移的依存削除エラー: {e}")
+            self.logger.error("推移的依存削除エラー: %s", e)
     
     def _apply_fallback_intra_dependencies(self, func_tasks: List[Dict[str, Any]]) -> None:
         """フォールバック用の機能内依存関係"""
-        category_order = ["DB設計", "バックエンド", "フロントエンド", "テスト"]
-        
         func_tasks.sort(key=lambda t: (
-            category_order.index(t.get("category", "")) if t.get("category") in category_order else 99,
+            _FALLBACK_CATEGORY_RANK.get(t.get("category"), 99),
             0 if t.get("priority") == "Must" else 1
         ))
         
@@ -7,6 +7,7 @@ TaskHandsOnService: タスクハンズオン管理サービス
 """
 
 from typing import Dict, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from uuid import UUID
 
@@ -88,14 +89,8 @@ class TaskHandsOnService:
         Returns:
             削除件数
         """
-        # プロジェクトのタスクIDを取得
-        task_ids = [
-            task.task_id
-            for task in self.db.query(Task).filter_by(project_id=project_id).all()
-        ]
-
-        if not task_ids:
-            return 0
+        # プロジェクトのタスクID（行全体は読み込まず、サブクエリとしてDB側で解決する）
+        task_ids = select(Task.task_id).where(Task.project_id == project_id)
 
         # ハンズオンを削除
         deleted_count = (
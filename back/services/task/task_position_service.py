@@ -23,7 +23,7 @@ class TaskPositionService(BaseService):
         2. 各レイヤー内で機能・カテゴリごとにグループ化
         3. 美しい配置でX,Y座標を計算
         """
-        print(f"座標計算開始: {len(tasks)}個のタスク")
+        self.logger.info("座標計算開始: %s個のタスク", len(tasks))
         
         # 依存関係グラフを構築
         dependency_graph = self._build_dependency_graph(tasks, edges)
@@ -37,7 +37,7 @@ class TaskPositionService(BaseService):
         # 座標を計算
         positioned_tasks = self._assign_coordinates(grouped_layers, tasks)
         
-        print(f"座標計算完了: {len(layers)}レイヤー")
+        self.logger.info("座標計算完了: %sレイヤー", len(layers))
         return positioned_tasks
     
     def _build_dependency_graph(self, tasks: List[Dict[str, Any]], edges: List[Dict[str, Any]]) -> Dict[str, List[str]]:
@@ -1,13 +1,14 @@
 # Tech domain services
 # 技術選定、フレームワーク、環境構築に関するサービス
 
-from .framework_service import FrameworkService
+from .framework_service import FrameworkService, TechnologyOption
 from .technology_service import TechnologyService
 from .tech_selection_service import TechSelectionService
 from .env_setup_agent_service import EnvSetupAgentService
 
 __all__ = [
     "FrameworkService",
+    "TechnologyOption",
     "TechnologyService",
     "TechSelectionService",
     "EnvSetupAgentService",
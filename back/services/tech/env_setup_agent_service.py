@@ -6,7 +6,7 @@ frame_work_docからAIで環境構築情報を生成し、Envテーブルに保
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_classic.output_parsers import ResponseSchema, StructuredOutputParser
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from models.project_base import ProjectDocument, Env
 from ..core import BaseService
 import uuid
@@ -76,7 +76,9 @@ class EnvSetupAgentService(BaseService):
         """
         self.logger.debug(f"Fetching frame_work_doc for project: {project_id}")
 
-        doc = self.db.query(ProjectDocument).filter(
+        doc = self.db.query(ProjectDocument).options(
+            load_only(ProjectDocument.frame_work_doc)
+        ).filter(
             ProjectDocument.project_id == uuid.UUID(project_id)
         ).first()
 
@@ -1,218 +1,336 @@
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_classic.output_parsers import StructuredOutputParser, ResponseSchema
-from ..core import BaseService
+import asyncio
+from ..core import BaseService, SemanticCache
 from sqlalchemy.orm import Session
-from typing import List
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+@dataclass(slots=True, frozen=True)
+class TechnologyOption:
+    """プラットフォーム別の技術オプション1件"""
+    name: str
+    category: str
+    description: str
+    pros: Tuple[str, ...]
+    cons: Tuple[str, ...]
+    difficulty: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSONレスポンス用のdictに変換する"""
+        data = asdict(self)
+        data["pros"] = list(self.pros)
+        data["cons"] = list(self.cons)
+        return data
+
+
+# プラットフォーム別の技術オプション（静的データなのでimport時に1度だけ構築する）
+_TECHNOLOGY_OPTIONS: Dict[str, Tuple[TechnologyOption, ...]] = {
+    "web": (
+        # Frontend Technologies
+        TechnologyOption("React", "frontend", "人気のJavaScript UIライブラリ",
+                         pros=("大規模なコミュニティ", "豊富なライブラリ", "学習リソースが豊富"),
+                         cons=("学習コストが高い", "設定が複雑"), difficulty="intermediate"),
+        TechnologyOption("Vue.js", "frontend", "プログレッシブJavaScriptフレームワーク",
+                         pros=("学習しやすい", "軽量", "日本語ドキュメント充実"),
+                         cons=("企業採用が少ない", "大規模開発向けではない"), difficulty="beginner"),
+        TechnologyOption("Next.js", "frontend", "Reactベースのフルスタックフレームワーク",
+                         pros=("SSR/SSG対応", "API Routes", "最適化済み"),
+                         cons=("Reactの知識が必要", "複雑な設定"), difficulty="intermediate"),
+        TechnologyOption("Angular", "frontend", "Googleが開発するフルスタックフレームワーク",
+                         pros=("TypeScript標準", "企業向け機能充実", "大規模開発向け"),
+                         cons=("学習コストが高い", "バンドルサイズが大きい"), difficulty="advanced"),
+        TechnologyOption("Svelte", "frontend", "コンパイル時最適化フレームワーク",
+                         pros=("軽量", "高速", "直感的な構文"),
+                         cons=("エコシステムが小さい", "企業採用が少ない"), difficulty="intermediate"),
+        # Backend Technologies
+        TechnologyOption("Node.js + Express", "backend", "JavaScriptバックエンド環境",
+                         pros=("フロントエンドと言語統一", "NPMエコシステム", "軽量"),
+                         cons=("シングルスレッド", "型安全性が低い"), difficulty="beginner"),
+        TechnologyOption("FastAPI (Python)", "backend", "高速なPython APIフレームワーク",
+                         pros=("自動ドキュメント生成", "型ヒント対応", "高性能"),
+                         cons=("Pythonの知識が必要", "新しいフレームワーク"), difficulty="intermediate"),
+        TechnologyOption("Django (Python)", "backend", "Pythonのフルスタックフレームワーク",
+                         pros=("バッテリー内蔵", "管理画面自動生成", "セキュア"),
+                         cons=("重厚", "小規模プロジェクトには過剰"), difficulty="intermediate"),
+        TechnologyOption("Ruby on Rails", "backend", "Ruby on Railsフレームワーク",
+                         pros=("開発速度が速い", "豊富なgem", "MVCアーキテクチャ"),
+                         cons=("パフォーマンスが劣る", "学習コストが高い"), difficulty="intermediate"),
+        TechnologyOption("Spring Boot (Java)", "backend", "Javaの企業向けフレームワーク",
+                         pros=("エンタープライズ級", "豊富な機能", "大規模開発対応"),
+                         cons=("重厚", "設定が複雑", "起動が遅い"), difficulty="advanced"),
+        TechnologyOption("Gin (Go)", "backend", "高性能なGo言語フレームワーク",
+                         pros=("高速", "軽量", "並行処理に強い"),
+                         cons=("学習コストが高い", "エコシステムが小さい"), difficulty="advanced"),
+        TechnologyOption("Laravel (PHP)", "backend", "PHPの人気フレームワーク",
+                         pros=("開発効率が高い", "豊富な機能", "学習しやすい"),
+                         cons=("パフォーマンスが劣る", "PHP特有の問題"), difficulty="beginner"),
+        # Database Technologies
+        TechnologyOption("PostgreSQL", "database", "高機能なオープンソースRDB",
+                         pros=("ACID準拠", "JSON対応", "拡張性が高い"),
+                         cons=("設定が複雑", "メモリ使用量が多い"), difficulty="intermediate"),
+        TechnologyOption("MySQL", "database", "世界で最も人気のあるRDB",
+                         pros=("高速", "軽量", "豊富な情報"),
+                         cons=("機能が限定的", "データ整合性の問題"), difficulty="beginner"),
+        TechnologyOption("MongoDB", "database", "NoSQLドキュメントデータベース",
+                         pros=("柔軟なスキーマ", "スケーラブル", "JSON形式"),
+                         cons=("ACID保証が弱い", "メモリ使用量が多い"), difficulty="intermediate"),
+        TechnologyOption("Redis", "database", "インメモリデータストア",
+                         pros=("超高速", "キャッシュに最適", "多様なデータ構造"),
+                         cons=("メモリ依存", "永続化の制限"), difficulty="beginner"),
+        # Deployment Technologies
+        TechnologyOption("Vercel", "deployment", "フロントエンド特化のホスティング",
+                         pros=("簡単デプロイ", "CDN内蔵", "Next.js最適化"),
+                         cons=("バックエンド制限", "コストが高い"), difficulty="beginner"),
+        TechnologyOption("AWS (EC2/ECS)", "deployment", "Amazon Web Servicesクラウド",
+                         pros=("豊富なサービス", "スケーラブル", "企業級"),
+                         cons=("複雑", "コスト管理が困難", "学習コストが高い"), difficulty="advanced"),
+        TechnologyOption("Docker + Heroku", "deployment", "コンテナ化とPaaSの組み合わせ",
+                         pros=("簡単デプロイ", "環境統一", "スケーラブル"),
+                         cons=("コストが高い", "制限が多い"), difficulty="intermediate")
+    ),
+    "ios": (
+        TechnologyOption("Swift + UIKit", "frontend", "iOS標準開発言語とフレームワーク",
+                         pros=("ネイティブ性能", "豊富なAPI", "Apple公式サポート"),
+                         cons=("iOS専用", "学習コストが高い"), difficulty="intermediate"),
+        TechnologyOption("Swift + SwiftUI", "frontend", "最新のSwift UIフレームワーク",
+                         pros=("宣言的UI", "プレビュー機能", "macOS/watchOS対応"),
+                         cons=("iOS 13以降限定", "まだ発展途上"), difficulty="intermediate"),
+        TechnologyOption("React Native", "frontend", "クロスプラットフォーム開発フレームワーク",
+                         pros=("コード共有可能", "Reactの知識活用", "ホットリロード"),
+                         cons=("ネイティブより性能劣る", "プラットフォーム固有機能制限"), difficulty="intermediate"),
+        TechnologyOption("Firebase", "backend", "Googleのモバイル向けBaaS",
+                         pros=("簡単セットアップ", "リアルタイムDB", "認証機能"),
+                         cons=("ベンダーロックイン", "複雑なクエリ制限"), difficulty="beginner")
+    ),
+    "android": (
+        TechnologyOption("Kotlin + Jetpack Compose", "frontend", "Android標準開発とモダンUIフレームワーク",
+                         pros=("ネイティブ性能", "最新UI", "Kotlin言語"),
+                         cons=("Android専用", "新しいため情報少ない"), difficulty="intermediate"),
+        TechnologyOption("Java + XML", "frontend", "従来のAndroid開発手法",
+                         pros=("安定している", "豊富な情報", "Javaの知識活用"),
+                         cons=("冗長なコード", "開発効率が低い"), difficulty="beginner"),
+        TechnologyOption("React Native", "frontend", "クロスプラットフォーム開発フレームワーク",
+                         pros=("コード共有可能", "Reactの知識活用", "開発速度"),
+                         cons=("ネイティブより性能劣る", "プラットフォーム固有機能制限"), difficulty="intermediate"),
+        TechnologyOption("Firebase", "backend", "Googleのモバイル向けBaaS",
+                         pros=("簡単セットアップ", "リアルタイムDB", "認証機能"),
+                         cons=("ベンダーロックイン", "複雑なクエリ制限"), difficulty="beginner")
+    )
+}
+
+# レスポンス用のdictもimport時に1度だけ作る（リクエストごとに asdict しない）
+_TECHNOLOGY_OPTION_DICTS: Dict[str, List[Dict[str, Any]]] = {
+    platform: [option.to_dict() for option in options]
+    for platform, options in _TECHNOLOGY_OPTIONS.items()
+}
+
+
+# 出力スキーマは固定なので、パーサーとフォーマット指示文はimport時に1度だけ構築する
+_PRIORITY_PARSER = StructuredOutputParser.from_response_schemas([
+    ResponseSchema(
+        name="frontend",
+        description="配列形式のフロントエンドフレームワークの提案。各項目は {name: string, priority: number, reason: string} の形式。",
+        type="array(objects)"
+    ),
+    ResponseSchema(
+        name="backend",
+        description="配列形式のバックエンドフレームワークの提案。各項目は {name: string, priority: number, reason: string} の形式。",
+        type="array(objects)"
+    )
+])
+_PRIORITY_FORMAT = _PRIORITY_PARSER.get_format_instructions()
+
+_RECOMMEND_PARSER = StructuredOutputParser.from_response_schemas([
+    ResponseSchema(
+        name="recommended_technologies",
+        description="推薦技術の配列。各項目は {name: string, priority: number, reason: string} の形式。priorityは1-10の数値（1が最高優先度）。",
+        type="array(objects)"
+    )
+])
+_RECOMMEND_FORMAT = _RECOMMEND_PARSER.get_format_instructions()
+
+_EVAL_PARSER = StructuredOutputParser.from_response_schemas([
+    ResponseSchema(
+        name="score",
+        description="選択の妥当性スコア（0.0-1.0）",
+        type="number"
+    ),
+    ResponseSchema(
+        name="feedback",
+        description="フィードバックの配列",
+        type="array(strings)"
+    ),
+    ResponseSchema(
+        name="alternatives",
+        description="代替案の配列",
+        type="array(objects)"
+    ),
+    ResponseSchema(
+        name="risks",
+        description="リスクの配列",
+        type="array(strings)"
+    )
+])
+_EVAL_FORMAT = _EVAL_PARSER.get_format_instructions()
+
+# 推薦結果は入力だけで決まるため、同じプロジェクト内の類似した仕様書ではLLM呼び出しを省略する
+_RECOMMEND_CACHE = SemanticCache("framework_service.recommendations")
+
 
 class FrameworkService(BaseService):
     def __init__(self, db:Session):
         super().__init__(db=db)
 
-    def generate_framework_priority(self, specification: str):
+    async def generate_framework_priority(self, specification: str):
         """
         仕様書の内容に基づき、固定のフロントエンド候補（React, Vue, Next, Astro）
         およびバックエンド候補（Nest, Flask, FastAPI, Rails, Gin）の優先順位と理由を
         JSON 形式で生成する。
         """
-        response_schemas = [
-            ResponseSchema(
-                name="frontend",
-                description="配列形式のフロントエンドフレームワークの提案。各項目は {name: string, priority: number, reason: string} の形式。",
-                type="array(objects)"
-            ),
-            ResponseSchema(
-                name="backend",
-                description="配列形式のバックエンドフレームワークの提案。各項目は {name: string, priority: number, reason: string} の形式。",
-                type="array(objects)"
-            )
-        ]
-        parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("framework_service", "generate_framework_priority"),
-            partial_variables={"format_instructions": parser.get_format_instructions()}
+        prompt_template = self.get_prompt_template(
+            "framework_service", "generate_framework_priority", _PRIORITY_FORMAT
         )
 
-        chain = prompt_template | self.llm_flash | parser
-        result = chain.invoke({"specification": specification})
+        chain = prompt_template | self.llm_flash | _PRIORITY_PARSER
+        result = await chain.ainvoke({"specification": specification})
         return result
-    def generate_framework_recommendations(self, specification: str, function_doc: str = ""):
+    async def generate_framework_recommendations(
+        self,
+        specification: str,
+        function_doc: str = "",
+        project_id: Optional[str] = None,
+    ):
         """
         仕様書と機能ドキュメントの内容に基づき、推薦技術の名前、優先度、理由のみを返す。
         その他の技術は自由選択として扱う。
+
+        project_id を渡した場合のみ、同じプロジェクト内のキャッシュを使う
+        （別プロジェクトの推薦結果を返さないため）。
         """
-        response_schemas = [
-            ResponseSchema(
-                name="recommended_technologies",
-                description="推薦技術の配列。各項目は {name: string, priority: number, reason: string} の形式。priorityは1-10の数値（1が最高優先度）。",
-                type="array(objects)"
-            )
-        ]
-        parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("framework_service", "generate_simple_recommendations"),
-            partial_variables={"format_instructions": parser.get_format_instructions()}
+        prompt_template = self.get_prompt_template(
+            "framework_service", "generate_simple_recommendations", _RECOMMEND_FORMAT
         )
 
-        chain = prompt_template | self.llm_flash | parser
-        result = chain.invoke({
+        cache_text = f"{specification}\n---\n{function_doc}"
+        embedding = None
+        if project_id is not None:
+            cached, embedding = await _RECOMMEND_CACHE.aget(cache_text, scope=project_id)
+            if cached is not None:
+                return cached
+
+        chain = prompt_template | self.llm_flash | _RECOMMEND_PARSER
+        result = await chain.ainvoke({
             "specification": specification,
             "function_doc": function_doc
         })
+        if project_id is not None:
+            await _RECOMMEND_CACHE.aset(cache_text, result, embedding=embedding, scope=project_id)
         return result
 
-    def generate_framework_document(self, specification: str, framework: str):
+    async def generate_framework_priority_and_recommendations(
+        self,
+        specification: str,
+        function_doc: str = "",
+        project_id: Optional[str] = None,
+    ) -> Tuple[Any, Any]:
+        """
+        優先順位と推薦技術は互いに独立しているため、2つのLLM呼び出しを並行に実行する。
+        所要時間は2回分の合計ではなく、遅い方1回分になる。
+
+        Returns:
+            (generate_framework_priority の結果, generate_framework_recommendations の結果)
+        """
+        return await asyncio.gather(
+            self.generate_framework_priority(specification),
+            self.generate_framework_recommendations(specification, function_doc, project_id),
+        )
+
+    async def generate_framework_recommendations_batch(
+        self,
+        requests: List[Tuple[str, str]],
+        max_concurrency: int = 5,
+    ):
+        """
+        複数の (仕様書, 機能ドキュメント) について推薦技術をまとめて生成する。
+        chain.abatch で最大 max_concurrency 件ずつ並行にLLMへ問い合わせる。
+        """
+        prompt_template = self.get_prompt_template(
+            "framework_service", "generate_simple_recommendations", _RECOMMEND_FORMAT
+        )
+
+        chain = prompt_template | self.llm_flash | _RECOMMEND_PARSER
+        return await chain.abatch(
+            [{"specification": spec, "function_doc": function_doc} for spec, function_doc in requests],
+            config={"max_concurrency": max_concurrency},
+        )
+
+    async def generate_framework_document(self, specification: str, framework: str):
         """
         仕様書の内容に基づき、固定のフロントエンド候補
         およびバックエンド候補の選択肢かを選んだものからそのフレームワークに沿った技術要件書を作成する。
         """
 
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("framework_service", "generate_framework_document")
-        )
+        return "".join([chunk async for chunk in self.stream_framework_document(specification, framework)])
+
+    async def stream_framework_document(self, specification: str, framework: str) -> AsyncIterator[str]:
+        """
+        技術要件書をテキストチャンク単位でストリーミング生成する。
+        """
+        prompt_template = self.get_prompt_template("framework_service", "generate_framework_document")
 
         chain = prompt_template | self.llm_flash | StrOutputParser()
-        result = chain.invoke({"specification": specification, "frame_work": framework})
-        return result
+        async for chunk in chain.astream({"specification": specification, "frame_work": framework}):
+            yield chunk
 
-    def get_technology_options(self, platform: str):
+    async def generate_framework_document_batch(
+        self,
+        requests: List[Tuple[str, str]],
+        max_concurrency: int = 5,
+    ) -> List[str]:
+        """
+        複数の (仕様書, 技術選定) について技術要件書をまとめて生成する。
+        """
+        prompt_template = self.get_prompt_template("framework_service", "generate_framework_document")
+
+        chain = prompt_template | self.llm_flash | StrOutputParser()
+        return await chain.abatch(
+            [{"specification": spec, "frame_work": framework} for spec, framework in requests],
+            config={"max_concurrency": max_concurrency},
+        )
+
+    def get_technology_options(self, platform: str) -> Tuple[TechnologyOption, ...]:
         """
         プラットフォーム別の技術オプションを取得
         """
-        technology_options = {
-            "web": [
-                # Frontend Technologies
-                {"name": "React", "category": "frontend", "description": "人気のJavaScript UIライブラリ",
-                 "pros": ["大規模なコミュニティ", "豊富なライブラリ", "学習リソースが豊富"],
-                 "cons": ["学習コストが高い", "設定が複雑"], "difficulty": "intermediate"},
-                {"name": "Vue.js", "category": "frontend", "description": "プログレッシブJavaScriptフレームワーク",
-                 "pros": ["学習しやすい", "軽量", "日本語ドキュメント充実"],
-                 "cons": ["企業採用が少ない", "大規模開発向けではない"], "difficulty": "beginner"},
-                {"name": "Next.js", "category": "frontend", "description": "Reactベースのフルスタックフレームワーク",
-                 "pros": ["SSR/SSG対応", "API Routes", "最適化済み"],
-                 "cons": ["Reactの知識が必要", "複雑な設定"], "difficulty": "intermediate"},
-                {"name": "Angular", "category": "frontend", "description": "Googleが開発するフルスタックフレームワーク",
-                 "pros": ["TypeScript標準", "企業向け機能充実", "大規模開発向け"],
-                 "cons": ["学習コストが高い", "バンドルサイズが大きい"], "difficulty": "advanced"},
-                {"name": "Svelte", "category": "frontend", "description": "コンパイル時最適化フレームワーク",
-                 "pros": ["軽量", "高速", "直感的な構文"],
-                 "cons": ["エコシステムが小さい", "企業採用が少ない"], "difficulty": "intermediate"},
-                # Backend Technologies
-                {"name": "Node.js + Express", "category": "backend", "description": "JavaScriptバックエンド環境",
-                 "pros": ["フロントエンドと言語統一", "NPMエコシステム", "軽量"],
-                 "cons": ["シングルスレッド", "型安全性が低い"], "difficulty": "beginner"},
-                {"name": "FastAPI (Python)", "category": "backend", "description": "高速なPython APIフレームワーク",
-                 "pros": ["自動ドキュメント生成", "型ヒント対応", "高性能"],
-                 "cons": ["Pythonの知識が必要", "新しいフレームワーク"], "difficulty": "intermediate"},
-                {"name": "Django (Python)", "category": "backend", "description": "Pythonのフルスタックフレームワーク",
-                 "pros": ["バッテリー内蔵", "管理画面自動生成", "セキュア"],
-                 "cons": ["重厚", "小規模プロジェクトには過剰"], "difficulty": "intermediate"},
-                {"name": "Ruby on Rails", "category": "backend", "description": "Ruby on Railsフレームワーク",
-                 "pros": ["開発速度が速い", "豊富なgem", "MVCアーキテクチャ"],
-                 "cons": ["パフォーマンスが劣る", "学習コストが高い"], "difficulty": "intermediate"},
-                {"name": "Spring Boot (Java)", "category": "backend", "description": "Javaの企業向けフレームワーク",
-                 "pros": ["エンタープライズ級", "豊富な機能", "大規模開発対応"],
-                 "cons": ["重厚", "設定が複雑", "起動が遅い"], "difficulty": "advanced"},
-                {"name": "Gin (Go)", "category": "backend", "description": "高性能なGo言語フレームワーク",
-                 "pros": ["高速", "軽量", "並行処理に強い"],
-                 "cons": ["学習コストが高い", "エコシステムが小さい"], "difficulty": "advanced"},
-                {"name": "Laravel (PHP)", "category": "backend", "description": "PHPの人気フレームワーク",
-                 "pros": ["開発効率が高い", "豊富な機能", "学習しやすい"],
-                 "cons": ["パフォーマンスが劣る", "PHP特有の問題"], "difficulty": "beginner"},
-                # Database Technologies
-                {"name": "PostgreSQL", "category": "database", "description": "高機能なオープンソースRDB",
-                 "pros": ["ACID準拠", "JSON対応", "拡張性が高い"],
-                 "cons": ["設定が複雑", "メモリ使用量が多い"], "difficulty": "intermediate"},
-                {"name": "MySQL", "category": "database", "description": "世界で最も人気のあるRDB",
-                 "pros": ["高速", "軽量", "豊富な情報"],
-                 "cons": ["機能が限定的", "データ整合性の問題"], "difficulty": "beginner"},
-                {"name": "MongoDB", "category": "database", "description": "NoSQLドキュメントデータベース",
-                 "pros": ["柔軟なスキーマ", "スケーラブル", "JSON形式"],
-                 "cons": ["ACID保証が弱い", "メモリ使用量が多い"], "difficulty": "intermediate"},
-                {"name": "Redis", "category": "database", "description": "インメモリデータストア",
-                 "pros": ["超高速", "キャッシュに最適", "多様なデータ構造"],
-                 "cons": ["メモリ依存", "永続化の制限"], "difficulty": "beginner"},
-                # Deployment Technologies
-                {"name": "Vercel", "category": "deployment", "description": "フロントエンド特化のホスティング",
-                 "pros": ["簡単デプロイ", "CDN内蔵", "Next.js最適化"],
-                 "cons": ["バックエンド制限", "コストが高い"], "difficulty": "beginner"},
-                {"name": "AWS (EC2/ECS)", "category": "deployment", "description": "Amazon Web Servicesクラウド",
-                 "pros": ["豊富なサービス", "スケーラブル", "企業級"],
-                 "cons": ["複雑", "コスト管理が困難", "学習コストが高い"], "difficulty": "advanced"},
-                {"name": "Docker + Heroku", "category": "deployment", "description": "コンテナ化とPaaSの組み合わせ",
-                 "pros": ["簡単デプロイ", "環境統一", "スケーラブル"],
-                 "cons": ["コストが高い", "制限が多い"], "difficulty": "intermediate"}
-            ],
-            "ios": [
-                {"name": "Swift + UIKit", "category": "frontend", "description": "iOS標準開発言語とフレームワーク",
-                 "pros": ["ネイティブ性能", "豊富なAPI", "Apple公式サポート"],
-                 "cons": ["iOS専用", "学習コストが高い"], "difficulty": "intermediate"},
-                {"name": "Swift + SwiftUI", "category": "frontend", "description": "最新のSwift UIフレームワーク",
-                 "pros": ["宣言的UI", "プレビュー機能", "macOS/watchOS対応"],
-                 "cons": ["iOS 13以降限定", "まだ発展途上"], "difficulty": "intermediate"},
-                {"name": "React Native", "category": "frontend", "description": "クロスプラットフォーム開発フレームワーク",
-                 "pros": ["コード共有可能", "Reactの知識活用", "ホットリロード"],
-                 "cons": ["ネイティブより性能劣る", "プラットフォーム固有機能制限"], "difficulty": "intermediate"},
-                {"name": "Firebase", "category": "backend", "description": "Googleのモバイル向けBaaS",
-                 "pros": ["簡単セットアップ", "リアルタイムDB", "認証機能"],
-                 "cons": ["ベンダーロックイン", "複雑なクエリ制限"], "difficulty": "beginner"}
-            ],
-            "android": [
-                {"name": "Kotlin + Jetpack Compose", "category": "frontend", "description": "Android標準開発とモダンUIフレームワーク",
-                 "pros": ["ネイティブ性能", "最新UI", "Kotlin言語"],
-                 "cons": ["Android専用", "新しいため情報少ない"], "difficulty": "intermediate"},
-                {"name": "Java + XML", "category": "frontend", "description": "従来のAndroid開発手法",
-                 "pros": ["安定している", "豊富な情報", "Javaの知識活用"],
-                 "cons": ["冗長なコード", "開発効率が低い"], "difficulty": "beginner"},
-                {"name": "React Native", "category": "frontend", "description": "クロスプラットフォーム開発フレームワーク",
-                 "pros": ["コード共有可能", "Reactの知識活用", "開発速度"],
-                 "cons": ["ネイティブより性能劣る", "プラットフォーム固有機能制限"], "difficulty": "intermediate"},
-                {"name": "Firebase", "category": "backend", "description": "Googleのモバイル向けBaaS",
-                 "pros": ["簡単セットアップ", "リアルタイムDB", "認証機能"],
-                 "cons": ["ベンダーロックイン", "複雑なクエリ制限"], "difficulty": "beginner"}
-            ]
-        }
-        return technology_options.get(platform, [])
-
-    def evaluate_framework_choice(self, specification: str, selected_technologies: List[str], platform: str):
+        return _TECHNOLOGY_OPTIONS.get(platform, ())
+
+    def get_technology_option_dicts(self, platform: str) -> List[Dict[str, Any]]:
+        """
+        プラットフォーム別の技術オプションをJSONレスポンス用のdictで取得（共有オブジェクトなので変更しないこと）
+        """
+        return _TECHNOLOGY_OPTION_DICTS.get(platform, [])
+
+    async def evaluate_framework_choice(
+        self,
+        specification: str,
+        selected_technologies: List[str],
+        platform: str,
+        selected_technologies_text: Optional[str] = None,
+    ):
         """
         選択されたフレームワークの妥当性を評価
+        selected_technologies_text: 呼び出し側で結合済みの技術名（指定時は再結合しない）
         """
-        response_schemas = [
-            ResponseSchema(
-                name="score",
-                description="選択の妥当性スコア（0.0-1.0）",
-                type="number"
-            ),
-            ResponseSchema(
-                name="feedback",
-                description="フィードバックの配列",
-                type="array(strings)"
-            ),
-            ResponseSchema(
-                name="alternatives",
-                description="代替案の配列",
-                type="array(objects)"
-            ),
-            ResponseSchema(
-                name="risks",
-                description="リスクの配列",
-                type="array(strings)"
-            )
-        ]
-        parser = StructuredOutputParser.from_response_schemas(response_schemas)
-
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("framework_service", "evaluate_framework_choice"),
-            partial_variables={"format_instructions": parser.get_format_instructions()}
+        prompt_template = self.get_prompt_template(
+            "framework_service", "evaluate_framework_choice", _EVAL_FORMAT
         )
 
-        chain = prompt_template | self.llm_flash | parser
-        result = chain.invoke({
+        chain = prompt_template | self.llm_flash | _EVAL_PARSER
+        result = await chain.ainvoke({
             "specification": specification,
-            "selected_technologies": ", ".join(selected_technologies),
+            "selected_technologies": selected_technologies_text or ", ".join(selected_technologies),
             "platform": platform
         })
         return result
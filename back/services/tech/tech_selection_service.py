@@ -8,6 +8,7 @@
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
+from sqlalchemy import exists, func, true
 from sqlalchemy.orm import Session
 
 from models.tech_preset import TechDomain, TechStack
@@ -19,6 +20,10 @@ class TechSelectionService:
 
     def __init__(self, db: Session):
         self.db = db
+        # マスタデータ（domain / stack）はほとんど変わらないため、インスタンス（リクエスト）単位でキャッシュする
+        self._domains_cache: Dict[Optional[str], List[TechDomain]] = {}
+        self._stacks_cache: Dict[tuple, List[TechStack]] = {}
+        self._domain_by_key_cache: Dict[str, Optional[TechDomain]] = {}
 
     def get_available_domains(self, ecosystem: Optional[str] = None) -> List[TechDomain]:
         """
@@ -31,17 +36,29 @@ class TechSelectionService:
         Returns:
             有効なTechDomainのリスト
         """
-        query = self.db.query(TechDomain).filter(TechDomain.is_active == True)
+        if ecosystem in self._domains_cache:
+            return self._domains_cache[ecosystem]
+
+        domains = self._active_domains_query(TechDomain, ecosystem=ecosystem).all()
+        self._domains_cache[ecosystem] = domains
+        return domains
+
+    def _active_domains_query(self, *entities, ecosystem: Optional[str] = None):
+        """有効なdomainを対象にしたクエリ（ecosystem指定時はstackが存在するdomainのみ）"""
+        query = self.db.query(*entities).filter(TechDomain.is_active == True)
 
         if ecosystem:
             # 指定エコシステムにstackが存在するdomainのみ
-            subquery = self.db.query(TechStack.domain_id).filter(
-                TechStack.is_active == True,
-                (TechStack.ecosystem == ecosystem) | (TechStack.ecosystem == None)
-            ).distinct()
-            query = query.filter(TechDomain.id.in_(subquery))
+            # （IN + DISTINCT ではなく相関EXISTSにして、最初に一致したstackで打ち切らせる）
+            query = query.filter(
+                exists().where(
+                    TechStack.domain_id == TechDomain.id,
+                    TechStack.is_active == True,
+                    (TechStack.ecosystem == ecosystem) | (TechStack.ecosystem == None)
+                )
+            )
 
-        return query.all()
+        return query
 
     def get_stacks_for_domain(
         self,
@@ -58,16 +75,16 @@ class TechSelectionService:
         Returns:
             有効なTechStackのリスト
         """
-        domain = self.db.query(TechDomain).filter(
+        cache_key = (domain_key, ecosystem)
+        if cache_key in self._stacks_cache:
+            return self._stacks_cache[cache_key]
+
+        # domain_key → domain.id の解決とstack取得を1回のJOINクエリで行う
+        query = self.db.query(TechStack).join(
+            TechDomain, TechDomain.id == TechStack.domain_id
+        ).filter(
             TechDomain.key == domain_key,
-            TechDomain.is_active == True
-        ).first()
-
-        if not domain:
-            return []
-
-        query = self.db.query(TechStack).filter(
-            TechStack.domain_id == domain.id,
+            TechDomain.is_active == True,
             TechStack.is_active == True
         )
 
@@ -76,7 +93,9 @@ class TechSelectionService:
                 (TechStack.ecosystem == ecosystem) | (TechStack.ecosystem == None)
             )
 
-        return query.all()
+        stacks = query.all()
+        self._stacks_cache[cache_key] = stacks
+        return stacks
 
     def get_domain_by_key(self, domain_key: str) -> Optional[TechDomain]:
         """
@@ -88,10 +107,12 @@ class TechSelectionService:
         Returns:
             TechDomainまたはNone
         """
-        return self.db.query(TechDomain).filter(
-            TechDomain.key == domain_key,
-            TechDomain.is_active == True
-        ).first()
+        if domain_key not in self._domain_by_key_cache:
+            self._domain_by_key_cache[domain_key] = self.db.query(TechDomain).filter(
+                TechDomain.key == domain_key,
+                TechDomain.is_active == True
+            ).first()
+        return self._domain_by_key_cache[domain_key]
 
     def get_decided_domains(
         self,
@@ -108,7 +129,11 @@ class TechSelectionService:
         Returns:
             決定済みのdomain_key → stack_keyのマッピング
         """
-        query = self.db.query(TaskHandsOn).join(Task).filter(
+        if self.db.get_bind().dialect.name == "postgresql":
+            return self._get_decided_domains_sql(project_id, exclude_task_id)
+
+        # 参照するのは user_interactions のみなので、その列だけを取得する
+        query = self.db.query(TaskHandsOn.user_interactions).join(Task).filter(
             Task.project_id == project_id,
             TaskHandsOn.generation_state == "completed"
         )
@@ -116,14 +141,12 @@ class TechSelectionService:
         if exclude_task_id:
             query = query.filter(Task.task_id != exclude_task_id)
 
-        completed_hands_ons = query.all()
-
         decided = {}
-        for ho in completed_hands_ons:
-            if not ho.user_interactions:
+        for (user_interactions,) in query.all():
+            if not user_interactions:
                 continue
 
-            choices = ho.user_interactions.get("choices", [])
+            choices = user_interactions.get("choices", [])
             for choice in choices:
                 # 新形式: {"domain_key": "xxx", "stack_key": "yyy"}
                 domain_key = choice.get("domain_key")
@@ -133,6 +156,41 @@ class TechSelectionService:
 
         return decided
 
+    def _get_decided_domains_sql(
+        self,
+        project_id: UUID,
+        exclude_task_id: Optional[UUID] = None
+    ) -> Dict[str, str]:
+        """
+        get_decided_domains のPostgreSQL版。
+
+        user_interactions.choices の展開をDB側（json_array_elements）で行い、
+        (domain_key, stack_key) の組だけを受け取る。
+        """
+        choice = func.json_array_elements(
+            TaskHandsOn.user_interactions["choices"]
+        ).table_valued("value").lateral("choice")
+        domain_key = choice.c.value.op("->>")("domain_key")
+        stack_key = choice.c.value.op("->>")("stack_key")
+
+        query = (
+            self.db.query(domain_key, stack_key)
+            .select_from(TaskHandsOn)
+            .join(Task, Task.task_id == TaskHandsOn.task_id)
+            .join(choice, true())
+            .filter(
+                Task.project_id == project_id,
+                TaskHandsOn.generation_state == "completed",
+                domain_key != "",
+                stack_key != "",
+            )
+        )
+
+        if exclude_task_id:
+            query = query.filter(Task.task_id != exclude_task_id)
+
+        return dict(query.all())
+
     def get_domains_for_prompt(self, ecosystem: Optional[str] = None) -> str:
         """
         LLMプロンプト用のdomain一覧テキストを生成
@@ -143,11 +201,14 @@ class TechSelectionService:
         Returns:
             "- orm_python: ORMライブラリ" のような形式のテキスト
         """
-        domains = self.get_available_domains(ecosystem)
-        lines = []
-        for d in domains:
-            lines.append(f"- {d.key}: {d.name}")
-        return "\n".join(lines)
+        # プロンプトには key と name しか使わないため、ORMエンティティではなく列の組で取得する
+        if ecosystem in self._domains_cache:
+            pairs = [(d.key, d.name) for d in self._domains_cache[ecosystem]]
+        else:
+            pairs = self._active_domains_query(
+                TechDomain.key, TechDomain.name, ecosystem=ecosystem
+            ).all()
+        return "\n".join(f"- {key}: {name}" for key, name in pairs)
 
     def get_decided_for_prompt(
         self,
@@ -168,9 +229,6 @@ class TechSelectionService:
         if not decided:
             return "なし"
 
-        lines = []
-        for domain_key, stack_key in decided.items():
-            lines.append(f"- {domain_key}: {stack_key}")
-        return "\n".join(lines)
+        return "\n".join(f"- {domain_key}: {stack_key}" for domain_key, stack_key in decided.items())
 
 
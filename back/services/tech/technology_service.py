@@ -1,90 +1,174 @@
-from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_classic.output_parsers import StructuredOutputParser, ResponseSchema
-from ..core import BaseService
+import asyncio
+from ..core import BaseService, SemanticCache
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+
+# 出力スキーマは固定なので、パーサーとフォーマット指示文はimport時に1度だけ構築する
+_INSTALL_PARSER = StructuredOutputParser.from_response_schemas([
+    ResponseSchema(
+        name="installation_steps",
+        description="インストール手順の配列。各ステップは文字列。",
+        type="array(strings)"
+    ),
+    ResponseSchema(
+        name="docker_setup",
+        description="Docker環境でのセットアップ手順の配列。",
+        type="array(strings)"
+    ),
+    ResponseSchema(
+        name="official_docs",
+        description="公式ドキュメントのURL",
+        type="string"
+    ),
+    ResponseSchema(
+        name="getting_started_guide",
+        description="入門ガイドのURL",
+        type="string"
+    ),
+    ResponseSchema(
+        name="prerequisites",
+        description="前提条件の配列",
+        type="array(strings)"
+    )
+])
+_INSTALL_FORMAT = _INSTALL_PARSER.get_format_instructions()
+
+# インストールガイドは技術名だけで決まるため、同じ技術名ならLLM呼び出しを省略する
+# （React/Preact や Vue 2/3 のように近い名前でも別物なので、類似ヒットは使わない）
+_INSTALL_CACHE = SemanticCache("technology_service.installation_guide", similarity=False)
+
 
 class TechnologyService(BaseService):
     def __init__(self, db: Session):
         super().__init__(db=db)
 
-    def generate_technology_document(self, selected_technologies: List[str], framework_doc: str = "") -> str:
+    async def generate_technology_document(
+        self,
+        selected_technologies: List[str],
+        framework_doc: str = "",
+        selected_technologies_text: Optional[str] = None,
+    ) -> str:
         """
         選択された技術に基づいて、Docker環境でのインストール手順と
         公式ドキュメントへのリンクを含む技術ドキュメントを生成する。
         """
 
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("technology_service", "generate_technology_document")
-        )
+        return "".join([
+            chunk async for chunk in self.stream_technology_document(
+                selected_technologies, framework_doc, selected_technologies_text
+            )
+        ])
+
+    async def stream_technology_document(
+        self,
+        selected_technologies: List[str],
+        framework_doc: str = "",
+        selected_technologies_text: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        技術ドキュメントをテキストチャンク単位でストリーミング生成する。
+        """
+        prompt_template = self.get_prompt_template("technology_service", "generate_technology_document")
 
-        technologies_text = ", ".join(selected_technologies)
+        technologies_text = selected_technologies_text or ", ".join(selected_technologies)
 
         chain = prompt_template | self.llm_flash | StrOutputParser()
-        result = chain.invoke({
+        async for chunk in chain.astream({
             "selected_technologies": technologies_text,
             "framework_doc": framework_doc
-        })
-        return result
+        }):
+            yield chunk
 
-    def get_technology_installation_guide(self, technology_name: str) -> Dict[str, Any]:
+    async def generate_technology_document_batch(
+        self,
+        requests: List[Tuple[List[str], str]],
+        max_concurrency: int = 5,
+    ) -> List[str]:
         """
-        特定の技術のインストールガイドと公式ドキュメントリンクを取得
+        複数の (選択技術, フレームワークドキュメント) について技術ドキュメントをまとめて生成する。
+        chain.abatch で最大 max_concurrency 件ずつ並行にLLMへ問い合わせる。
         """
 
-        response_schemas = [
-            ResponseSchema(
-                name="installation_steps",
-                description="インストール手順の配列。各ステップは文字列。",
-                type="array(strings)"
-            ),
-            ResponseSchema(
-                name="docker_setup",
-                description="Docker環境でのセットアップ手順の配列。",
-                type="array(strings)"
-            ),
-            ResponseSchema(
-                name="official_docs",
-                description="公式ドキュメントのURL",
-                type="string"
-            ),
-            ResponseSchema(
-                name="getting_started_guide",
-                description="入門ガイドのURL",
-                type="string"
-            ),
-            ResponseSchema(
-                name="prerequisites",
-                description="前提条件の配列",
-                type="array(strings)"
-            )
-        ]
-        parser = StructuredOutputParser.from_response_schemas(response_schemas)
+        prompt_template = self.get_prompt_template("technology_service", "generate_technology_document")
 
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("technology_service", "get_installation_guide"),
-            partial_variables={"format_instructions": parser.get_format_instructions()}
+        chain = prompt_template | self.llm_flash | StrOutputParser()
+        return await chain.abatch(
+            [
+                {"selected_technologies": ", ".join(technologies), "framework_doc": framework_doc}
+                for technologies, framework_doc in requests
+            ],
+            config={"max_concurrency": max_concurrency},
         )
 
-        chain = prompt_template | self.llm_flash | parser
-        result = chain.invoke({"technology_name": technology_name})
+    async def get_technology_installation_guide(self, technology_name: str) -> Dict[str, Any]:
+        """
+        特定の技術のインストールガイドと公式ドキュメントリンクを取得
+        """
+
+        prompt_template = self.get_prompt_template(
+            "technology_service", "get_installation_guide", _INSTALL_FORMAT
+        )
+
+        cached, _ = await _INSTALL_CACHE.aget(technology_name)
+        if cached is not None:
+            return cached
+
+        chain = prompt_template | self.llm_flash | _INSTALL_PARSER
+        result = await chain.ainvoke({"technology_name": technology_name})
+        await _INSTALL_CACHE.aset(technology_name, result)
         return result
 
-    def generate_development_environment_setup(self, selected_technologies: List[str], project_type: str = "web") -> str:
+    async def get_technology_installation_guides(
+        self,
+        technology_names: List[str],
+        max_concurrency: int = 5,
+    ) -> List[Dict[str, Any]]:
+        """
+        複数技術のインストールガイドを並行に取得する（結果は入力と同じ順序）。
+        レート制限対策として同時実行数を max_concurrency 件に抑える。
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _guarded(technology_name: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.get_technology_installation_guide(technology_name)
+
+        return await asyncio.gather(*(_guarded(name) for name in technology_names))
+
+    async def generate_development_environment_setup(
+        self,
+        selected_technologies: List[str],
+        project_type: str = "web",
+        selected_technologies_text: Optional[str] = None,
+    ) -> str:
         """
         選択された技術スタックに基づいて、統合的な開発環境のセットアップガイドを生成
         """
 
-        prompt_template = ChatPromptTemplate.from_template(
-            template=self.get_prompt("technology_service", "generate_environment_setup")
-        )
+        return "".join([
+            chunk async for chunk in self.stream_development_environment_setup(
+                selected_technologies, project_type, selected_technologies_text
+            )
+        ])
+
+    async def stream_development_environment_setup(
+        self,
+        selected_technologies: List[str],
+        project_type: str = "web",
+        selected_technologies_text: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        開発環境セットアップガイドをテキストチャンク単位でストリーミング生成する。
+        """
+        prompt_template = self.get_prompt_template("technology_service", "generate_environment_setup")
 
-        technologies_text = ", ".join(selected_technologies)
+        technologies_text = selected_technologies_text or ", ".join(selected_technologies)
 
         chain = prompt_template | self.llm_flash | StrOutputParser()
-        result = chain.invoke({
+        async for chunk in chain.astream({
             "selected_technologies": technologies_text,
             "project_type": project_type
-        })
-        return result
\ No newline at end of file
+        }):
+            yield chunk
\ No newline at end of file
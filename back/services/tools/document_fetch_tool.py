@@ -4,12 +4,143 @@ DocumentFetchTool: URL からドキュメントを取得してパースするツ
 Phase 3: タスクハンズオン生成のための公式ドキュメント取得
 """
 
-from typing import Optional, Dict
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import html2text
 from urllib.parse import urlparse
 
+# lxml（libxml2）があればそちらでパースする（html.parser より数倍速い）
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.html.clean import Cleaner
+    _HTML_PARSER = "lxml"
+    LXML_AVAILABLE = True
+except ImportError:
+    _HTML_PARSER = "html.parser"
+    LXML_AVAILABLE = False
+
+if LXML_AVAILABLE:
+    # メタデータ抽出用のXPath（コンパイルはimport時に1度だけ）
+    _METADATA_XPATHS = {
+        "title": etree.XPath("string((//title)[1])"),
+        "description": etree.XPath("string((//meta[@name='description']/@content)[1])"),
+        "og_title": etree.XPath("string((//meta[@property='og:title']/@content)[1])"),
+        "og_description": etree.XPath("string((//meta[@property='og:description']/@content)[1])"),
+    }
+
+    def _class_or_id(kind: str, name: str) -> str:
+        if kind == "class":
+            return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+        return f"@id='{name}'"
+
+    # クラス名・IDで除去する要素（_extract_main_content の unwanted_selectors と同じ）
+    _UNWANTED_XPATH = etree.XPath("//*[{}]".format(" or ".join(
+        [_class_or_id("class", name) for name in ("advertisement", "ad", "sidebar", "navigation", "menu")]
+        + [_class_or_id("id", name) for name in ("comments", "footer", "header")]
+    )))
+
+    # メインコンテンツ候補（優先順に評価する）
+    _MAIN_CONTENT_XPATHS = tuple(etree.XPath(xpath) for xpath in (
+        "(//main)[1]",
+        "(//article)[1]",
+        f"(//div[{_class_or_id('class', 'content')}])[1]",
+        "(//div[@id='content'])[1]",
+        f"(//div[{_class_or_id('class', 'main')}])[1]",
+        "(//div[@id='main'])[1]",
+        "(//body)[1]",
+    ))
+
+
+
+# lxml がない場合の不要要素セレクタ（_UNWANTED_XPATH と Cleaner の kill_tags に相当）
+_UNWANTED_CSS = ", ".join((
+    "script", "style", "nav", "header", "footer", "aside", "iframe", "noscript",
+    ".advertisement", ".ad", ".sidebar", ".navigation", ".menu",
+    "#comments", "#footer", "#header",
+))
+
+class _CachedResponse(NamedTuple):
+    html: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class _ResponseCache:
+    """
+    取得済みHTMLのプロセス内LRUキャッシュ（ツールのインスタンス間で共有）
+
+    ttl 秒以内の再取得はキャッシュをそのまま返し、それ以降は ETag / Last-Modified を
+    付けた条件付きGETで再検証する（304なら本文を再ダウンロードしない）。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[_CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: _CachedResponse) -> bool:
+        return time.monotonic() - entry.fetched_at < self.ttl
+
+    def put(self, url: str, html: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        with self._lock:
+            self._entries[url] = _CachedResponse(html, etag, last_modified, time.monotonic())
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def touch(self, url: str, entry: _CachedResponse) -> None:
+        """304応答を受けたエントリの鮮度を更新する"""
+        self.put(url, entry.html, entry.etag, entry.last_modified)
+
+    @staticmethod
+    def conditional_headers(entry: Optional[_CachedResponse]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_RESPONSE_CACHE = _ResponseCache(
+    maxsize=int(os.getenv("DOCUMENT_FETCH_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("DOCUMENT_FETCH_CACHE_TTL", "3600")),
+)
+
+# fetch_multiple で同じホストへ連続してリクエストする際の間隔（秒）
+_HOST_DELAY_SECONDS = float(os.getenv("DOCUMENT_FETCH_HOST_DELAY", "0.1"))
+
+
+def _group_by_host(urls: list[str]) -> Dict[str, list[int]]:
+    """URLのインデックスをホスト（netloc）ごとにまとめる（各ホスト内は入力順）"""
+    buckets: Dict[str, list[int]] = {}
+    for i, url in enumerate(urls):
+        buckets.setdefault(urlparse(url).netloc, []).append(i)
+    return buckets
+
 
 class DocumentFetchTool:
     """
@@ -18,23 +149,92 @@ class DocumentFetchTool:
     公式ドキュメントやブログ記事を取得して、読みやすいテキストに変換します。
     """
 
-    def __init__(self, timeout: int = 30, max_content_length: int = 100000):
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_content_length: int = 100000,
+        converter: Optional[str] = None,
+        max_download_bytes: Optional[int] = None
+    ):
         """
         初期化
 
         Args:
             timeout: HTTPリクエストのタイムアウト（秒）
             max_content_length: 最大コンテンツ長（文字数）
+            converter: Markdown変換方式（"html2text" または "trafilatura"）。
+                未指定時は環境変数 DOCUMENT_FETCH_CONVERTER（デフォルト: html2text）。
+                trafilatura は本文抽出とMarkdown変換をlxml上の1パスで行う。
+            max_download_bytes: 読み込むHTML本文の上限バイト数（超過分は読まずに打ち切る）。
+                未指定時は max_content_length の20倍（HTMLはMarkdown化で大きく縮むため）。
         """
         self.timeout = timeout
         self.max_content_length = max_content_length
+        self.max_download_bytes = max_download_bytes or max_content_length * 20
 
-        # HTML to Markdown コンバーター
-        self.html_converter = html2text.HTML2Text()
-        self.html_converter.ignore_links = False
-        self.html_converter.ignore_images = True
-        self.html_converter.ignore_emphasis = False
-        self.html_converter.body_width = 0  # 改行を無効化（元のフォーマット維持）
+        self.converter = converter or os.getenv("DOCUMENT_FETCH_CONVERTER", "html2text")
+        if self.converter not in ("html2text", "trafilatura"):
+            raise ValueError(f"Unknown converter: {self.converter}")
+        self._trafilatura = None
+        if self.converter == "trafilatura":
+            try:
+                import trafilatura
+            except ImportError:
+                raise ImportError(
+                    "trafilatura is not installed. "
+                    "Install it with: pip install trafilatura"
+                )
+            self._trafilatura = trafilatura
+
+        # HTML to Markdown コンバーター（内部状態を持つため、並列取得時はスレッドごとに分ける）
+        self._local = threading.local()
+
+        # 不要要素の除去（script/style/埋め込み/コメント + ナビゲーション類）をCレベルの1パスで行う
+        if LXML_AVAILABLE:
+            self._cleaner = Cleaner(
+                scripts=True,
+                javascript=True,
+                comments=True,
+                style=True,
+                embedded=True,
+                frames=True,
+                forms=False,
+                links=False,
+                meta=False,
+                page_structure=False,
+                annoying_tags=False,
+                remove_unknown_tags=False,
+                safe_attrs_only=False,
+                kill_tags=("nav", "header", "footer", "aside", "iframe", "noscript"),
+            )
+
+        # 同じホストへの再取得でTCP/TLSハンドシェイクを省くため、セッションを使い回す
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": (
+                "Mozilla/5.0 (compatible; TaskHandsOnBot/1.0; "
+                "+https://github.com/hackathon-support-agent)"
+            )
+        })
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def html_converter(self) -> html2text.HTML2Text:
+        converter = getattr(self._local, "html_converter", None)
+        if converter is None:
+            converter = html2text.HTML2Text()
+            converter.ignore_links = False
+            converter.ignore_images = True
+            converter.ignore_emphasis = False
+            converter.body_width = 0  # 改行を無効化（元のフォーマット維持）
+            self._local.html_converter = converter
+        return converter
 
     def fetch(
         self,
@@ -70,61 +270,66 @@ class DocumentFetchTool:
         if not parsed_url.scheme or not parsed_url.netloc:
             raise ValueError(f"Invalid URL: {url}")
 
+        cached = _RESPONSE_CACHE.get(url)
+        if cached is not None and _RESPONSE_CACHE.is_fresh(cached):
+            return self._build_result(
+                url,
+                parsed_url.netloc,
+                cached.html,
+                extract_main_content,
+                include_metadata
+            )
+
         try:
-            # HTTP GET リクエスト
-            response = requests.get(
+            # HTTP GET リクエスト（ヘッダーだけ先に受け取り、本文は上限まで読む）
+            with self.session.get(
                 url,
                 timeout=self.timeout,
-                headers={
-                    "User-Agent": (
-                        "Mozilla/5.0 (compatible; TaskHandsOnBot/1.0; "
-                        "+https://github.com/hackathon-support-agent)"
-                    )
-                },
-                allow_redirects=True
+                allow_redirects=True,
+                stream=True,
+                headers=_RESPONSE_CACHE.conditional_headers(cached)
+            ) as response:
+                body_truncated = False
+                if response.status_code == 304 and cached is not None:
+                    # 変更なし: キャッシュ済みの本文を使う
+                    _RESPONSE_CACHE.touch(url, cached)
+                    html = cached.html
+                else:
+                    response.raise_for_status()
+
+                    # Content-Type チェック（本文をダウンロードする前に判定する）
+                    content_type = response.headers.get("Content-Type", "")
+                    if "text/html" not in content_type.lower():
+                        raise ValueError(
+                            f"URL does not return HTML content (Content-Type: {content_type})"
+                        )
+
+                    chunks = []
+                    received = 0
+                    for chunk in response.iter_content(chunk_size=65536):
+                        chunks.append(chunk)
+                        received += len(chunk)
+                        if received > self.max_download_bytes:
+                            break
+                    html = b"".join(chunks)[:self.max_download_bytes]
+                    body_truncated = received > self.max_download_bytes
+                    if not body_truncated:
+                        # 上限で打ち切った本文は完全な応答としてキャッシュしない
+                        _RESPONSE_CACHE.put(
+                            url,
+                            html,
+                            response.headers.get("ETag"),
+                            response.headers.get("Last-Modified")
+                        )
+
+            return self._build_result(
+                url,
+                parsed_url.netloc,
+                html,
+                extract_main_content,
+                include_metadata,
+                body_truncated
             )
-            response.raise_for_status()
-
-            # Content-Type チェック
-            content_type = response.headers.get("Content-Type", "")
-            if "text/html" not in content_type.lower():
-                raise ValueError(
-                    f"URL does not return HTML content (Content-Type: {content_type})"
-                )
-
-            # HTMLパース
-            soup = BeautifulSoup(response.content, "html.parser")
-
-            # メタデータ取得
-            metadata = {}
-            if include_metadata:
-                metadata = self._extract_metadata(soup)
-
-            # コンテンツ抽出
-            if extract_main_content:
-                content_html = self._extract_main_content(soup)
-            else:
-                content_html = soup
-
-            # Markdown変換
-            content_markdown = self.html_converter.handle(str(content_html))
-
-            # 長すぎる場合は切り詰め
-            is_truncated = False
-            if len(content_markdown) > self.max_content_length:
-                content_markdown = content_markdown[:self.max_content_length]
-                content_markdown += "\n\n... (content truncated)"
-                is_truncated = True
-
-            return {
-                "url": url,
-                "title": metadata.get("title", ""),
-                "description": metadata.get("description", ""),
-                "content": content_markdown,
-                "content_length": len(content_markdown),
-                "domain": parsed_url.netloc,
-                "is_truncated": is_truncated
-            }
 
         except requests.exceptions.Timeout:
             raise requests.exceptions.RequestException(
@@ -139,6 +344,74 @@ class DocumentFetchTool:
                 f"Failed to fetch document from {url}: {e}"
             )
 
+    def _build_result(
+        self,
+        url: str,
+        domain: str,
+        html: bytes,
+        extract_main_content: bool,
+        include_metadata: bool,
+        body_truncated: bool = False
+    ) -> Dict:
+        """
+        取得済みのHTMLをパースして fetch の戻り値を組み立てる（キャッシュ済み・新規取得で共通）
+
+        body_truncated: HTML本文を max_download_bytes で打ち切った場合 True（is_truncated に反映）
+        """
+        content_markdown = None
+
+        if LXML_AVAILABLE:
+            # HTMLパース（lxmlのツリーを1度だけ作り、メタデータ・本文抽出で共有する）
+            tree = lxml.html.fromstring(html)
+
+            # メタデータ取得
+            metadata = self._extract_metadata_lxml(tree) if include_metadata else {}
+
+            # 本文抽出 + Markdown変換（trafilatura）
+            if self._trafilatura is not None and extract_main_content:
+                content_markdown = self._trafilatura.extract(
+                    tree,
+                    output_format="markdown",
+                    include_comments=False,
+                    include_tables=True,
+                    include_links=True
+                )
+
+            if content_markdown is None:
+                # コンテンツ抽出
+                content_node = self._extract_main_content_lxml(tree) if extract_main_content else tree
+                content_html = lxml.html.tostring(content_node, encoding="unicode")
+        else:
+            # HTMLパース
+            soup = BeautifulSoup(html, _HTML_PARSER)
+
+            # メタデータ取得
+            metadata = self._extract_metadata(soup) if include_metadata else {}
+
+            # コンテンツ抽出
+            content_html = str(self._extract_main_content(soup) if extract_main_content else soup)
+
+        # Markdown変換
+        if content_markdown is None:
+            content_markdown = self.html_converter.handle(content_html)
+
+        # 長すぎる場合は切り詰め
+        is_truncated = body_truncated
+        if len(content_markdown) > self.max_content_length:
+            content_markdown = content_markdown[:self.max_content_length]
+            content_markdown += "\n\n... (content truncated)"
+            is_truncated = True
+
+        return {
+            "url": url,
+            "title": metadata.get("title", ""),
+            "description": metadata.get("description", ""),
+            "content": content_markdown,
+            "content_length": len(content_markdown),
+            "domain": domain,
+            "is_truncated": is_truncated
+        }
+
     def _extract_metadata(self, soup: BeautifulSoup) -> Dict:
         """
         HTMLからメタデータを抽出
@@ -173,6 +446,25 @@ class DocumentFetchTool:
 
         return metadata
 
+    def _extract_metadata_lxml(self, tree) -> Dict:
+        """
+        _extract_metadata の lxml 版（XPathで直接値を取り出す）
+
+        Args:
+            tree: lxml.html でパースした要素ツリー
+
+        Returns:
+            メタデータの辞書（値が空のキーは含めない）
+        """
+        metadata = {}
+        for key, xpath in _METADATA_XPATHS.items():
+            value = xpath(tree)
+            if key == "title":
+                value = value.strip()
+            if value:
+                metadata[key] = str(value)
+        return metadata
+
     def _extract_main_content(self, soup: BeautifulSoup) -> BeautifulSoup:
         """
         HTMLからメインコンテンツのみを抽出
@@ -185,28 +477,9 @@ class DocumentFetchTool:
         Returns:
             メインコンテンツのBeautifulSoup
         """
-        # 不要な要素を削除
-        unwanted_tags = [
-            "script", "style", "nav", "header", "footer",
-            "aside", "iframe", "noscript"
-        ]
-        for tag in unwanted_tags:
-            for element in soup.find_all(tag):
-                element.decompose()
-
-        # クラス名・IDで不要な要素を削除
-        unwanted_selectors = [
-            {"class": "advertisement"},
-            {"class": "ad"},
-            {"class": "sidebar"},
-            {"class": "navigation"},
-            {"class": "menu"},
-            {"id": "comments"},
-            {"id": "footer"},
-            {"id": "header"},
-        ]
-        for selector in unwanted_selectors:
-            for element in soup.find_all(attrs=selector):
+        # 不要な要素を削除（タグ・クラス名・IDをまとめた1つのセレクタで走査する）
+        for element in soup.select(_UNWANTED_CSS):
+            if not element.decomposed:
                 element.decompose()
 
         # メインコンテンツを探す
@@ -222,20 +495,53 @@ class DocumentFetchTool:
 
         return main_content if main_content else soup
 
+    def _extract_main_content_lxml(self, tree):
+        """
+        _extract_main_content の lxml 版
+
+        Cleaner で不要要素を除去したうえで、メインコンテンツ候補を優先順に探す。
+
+        Args:
+            tree: lxml.html でパースした要素ツリー（この関数内で変更される）
+
+        Returns:
+            メインコンテンツの要素
+        """
+        self._cleaner(tree)
+
+        for element in _UNWANTED_XPATH(tree):
+            if element.getparent() is not None:
+                element.drop_tree()
+
+        for xpath in _MAIN_CONTENT_XPATHS:
+            found = xpath(tree)
+            if found:
+                return found[0]
+
+        return tree
+
     def fetch_multiple(
         self,
         urls: list[str],
-        extract_main_content: bool = True
+        extract_main_content: bool = True,
+        max_workers: int = 20,
+        host_delay: float = _HOST_DELAY_SECONDS
     ) -> list[Dict]:
         """
-        複数のURLからドキュメントを取得
+        複数のURLからドキュメントを並列に取得
+
+        取得はネットワーク待ちが支配的なため、スレッドプールで同時に実行する。
+        URLはホストごとにまとめ、同じホストへは1件ずつ（host_delay秒の間隔を空けて）
+        取得する。異なるホスト間は並列のまま。
 
         Args:
             urls: URLのリスト
             extract_main_content: メインコンテンツのみを抽出するか
+            max_workers: 同時に取得するホスト数の上限
+            host_delay: 同じホストへの連続リクエストの間隔（秒）
 
         Returns:
-            各URLの取得結果のリスト（エラーの場合はerrorキーを含む）
+            各URLの取得結果のリスト（入力順。エラーの場合はerrorキーを含む）
 
         Example:
             >>> tool = DocumentFetchTool()
@@ -244,24 +550,36 @@ class DocumentFetchTool:
             ...     "https://docs.python.org/3/library/asyncio.html"
             ... ])
         """
-        results = []
+        if not urls:
+            return []
 
-        for url in urls:
-            try:
-                result = self.fetch(
-                    url,
-                    extract_main_content=extract_main_content
-                )
-                results.append(result)
-            except Exception as e:
-                results.append({
-                    "url": url,
-                    "error": str(e),
-                    "success": False
-                })
+        results: list[Optional[Dict]] = [None] * len(urls)
+
+        def _fetch_host(indices: list[int]) -> None:
+            for n, i in enumerate(indices):
+                if n and host_delay:
+                    time.sleep(host_delay)
+                results[i] = self._fetch_or_error(urls[i], extract_main_content)
 
+        buckets = _group_by_host(urls)
+        with ThreadPoolExecutor(max_workers=min(len(buckets), max_workers)) as executor:
+            # 例外は _fetch_or_error 内で結果に変換済み
+            list(executor.map(_fetch_host, buckets.values()))
         return results
 
+    def _fetch_or_error(self, url: str, extract_main_content: bool) -> Dict:
+        try:
+            return self.fetch(
+                url,
+                extract_main_content=extract_main_content
+            )
+        except Exception as e:
+            return {
+                "url": url,
+                "error": str(e),
+                "success": False
+            }
+
     def fetch_as_text(self, url: str, max_length: int = 5000) -> str:
         """
         URLからテキストのみを取得（LLMプロンプト用の簡易版）
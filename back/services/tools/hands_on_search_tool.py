@@ -4,7 +4,9 @@ HandsOnSearchTool: プロジェクト内のハンズオンを検索するツー
 Phase 3: タスクハンズオン生成のためのプロジェクト内情報検索
 """
 
+import re
 from typing import List, Dict, Optional
+from sqlalchemy import JSON, case, cast, exists, func, literal, or_
 from sqlalchemy.orm import Session
 from models.project_base import Task, TaskHandsOn, TaskDependency
 from uuid import UUID
@@ -29,42 +31,68 @@ class HandsOnSearchTool:
         Returns:
             ハンズオンのリスト
         """
-        # プロジェクトの全タスクのハンズオンを取得
-        tasks_with_hands_on = (
+        # 複数語のクエリ（例: "authentication API"）は語ごとにマッチさせ、ヒットした語数で加点する
+        keywords = list(dict.fromkeys(query.lower().split())) or [query.lower()]
+
+        # いずれかの検索対象フィールドにいずれかの語を含むハンズオンだけをDB側で絞り込む
+        # （スコア計算はヒットした行に対してのみ行う）
+        searchable_columns = (
+            func.lower(Task.title),
+            func.lower(Task.category),
+            func.lower(TaskHandsOn.overview),
+        )
+        conditions = [
+            column.contains(keyword, autoescape=True)
+            for column in searchable_columns
+            for keyword in keywords
+        ]
+        # target_files は ensure_ascii で保存された JSON のため、文字列にキャストして照合すると
+        # 日本語のパスが \uXXXX になって一致せず、"path" などのキーや説明文にも一致してしまう。
+        # PostgreSQL では各要素の path だけを取り出して照合し、それ以外のDBでは
+        # パスだけに一致する行を落とさないよう絞り込みを行わず、Python 側の照合に任せる
+        hands_on_query = (
             self.db.query(Task, TaskHandsOn)
             .join(TaskHandsOn, Task.task_id == TaskHandsOn.task_id)
             .filter(Task.project_id == self.project_id)
             .filter(Task.task_id != self.current_task_id)  # 自分自身を除外
-            .all()
         )
+        if self.db.get_bind().dialect.name == "postgresql":
+            conditions.append(self._target_file_path_matches(keywords))
+            hands_on_query = hands_on_query.filter(or_(*conditions))
+        tasks_with_hands_on = hands_on_query.all()
 
         if not tasks_with_hands_on:
             return []
 
         # キーワードマッチング
-        query_lower = query.lower()
+        # 全ての語を1つの正規表現にまとめ、各フィールドを1回の走査で照合する
+        # （大文字小文字の無視も正規表現で行い、長い概要文などを小文字化してコピーしない）
+        pattern = re.compile(
+            "|".join(re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)),
+            re.IGNORECASE
+        )
+
+        def hit_count(text: Optional[str]) -> int:
+            if not text:
+                return 0
+            return len({match.group(0).lower() for match in pattern.finditer(text)})
+
         results = []
 
         for task, hands_on in tasks_with_hands_on:
-            score = 0
-
             # タイトルマッチ
-            if query_lower in (task.title or "").lower():
-                score += 10
+            score = 10 * hit_count(task.title)
 
             # カテゴリマッチ
-            if query_lower in (task.category or "").lower():
-                score += 5
+            score += 5 * hit_count(task.category)
 
             # 概要マッチ
-            if hands_on.overview and query_lower in hands_on.overview.lower():
-                score += 3
+            score += 3 * hit_count(hands_on.overview)
 
             # ターゲットファイルマッチ
             if hands_on.target_files:
                 for file_info in hands_on.target_files:
-                    if query_lower in file_info.get("path", "").lower():
-                        score += 8
+                    score += 8 * hit_count(file_info.get("path", ""))
 
             if score > 0:
                 # コード例の取得
@@ -90,6 +118,20 @@ class HandsOnSearchTool:
 
         return results[:max_results]
 
+    @staticmethod
+    def _target_file_path_matches(keywords: List[str]):
+        """target_files のいずれかの要素の path がいずれかの語を含むか（PostgreSQL専用）"""
+        # 配列以外（null など）が入っていても json_array_elements がエラーにならないよう空配列に置き換える
+        target_files = case(
+            (func.json_typeof(TaskHandsOn.target_files) == "array", TaskHandsOn.target_files),
+            else_=cast(literal("[]"), JSON),
+        )
+        target_file = func.json_array_elements(target_files).table_valued("value").alias("target_file")
+        path = func.lower(target_file.c.value.op("->>")("path"))
+        return exists().select_from(target_file).where(or_(*(
+            path.contains(keyword, autoescape=True) for keyword in keywords
+        )))
+
     def get_dependency_hands_on(self) -> List[Dict]:
         """
         依存タスクのハンズオンを取得
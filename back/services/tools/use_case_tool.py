@@ -4,7 +4,7 @@ UseCaseTool: 仕様書からユースケースフローを取得するツール
 Phase 3: タスクハンズオン生成のためのプロジェクト仕様参照
 """
 
-from typing import Optional
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from models.project_base import ProjectDocument
 from uuid import UUID
@@ -16,6 +16,11 @@ class UseCaseTool:
     def __init__(self, db: Session, project_id: str):
         self.db = db
         self.project_id = UUID(project_id)
+        # 仕様書本文（エージェントの推論ループ中に何度も呼ばれるため初回取得後は使い回す）
+        self._spec: Optional[str] = None
+        self._spec_lower = ""
+        # カテゴリごとの抽出結果（同じ仕様書・カテゴリなら結果は変わらない）
+        self._flows: Dict[str, str] = {}
 
     def get_flow(self, task_category: Optional[str] = None) -> str:
         """
@@ -27,42 +32,56 @@ class UseCaseTool:
         Returns:
             ユースケースフロー文字列
         """
-        # プロジェクトドキュメント取得
-        doc = (
-            self.db.query(ProjectDocument)
-            .filter(ProjectDocument.project_id == self.project_id)
-            .first()
-        )
-
-        if not doc or not doc.specification:
+        # 仕様書取得（specification 列のみ）
+        if self._spec is None:
+            self._spec = (
+                self.db.query(ProjectDocument.specification)
+                .filter(ProjectDocument.project_id == self.project_id)
+                .scalar()
+            ) or ""
+            self._spec_lower = self._spec.lower()
+
+        if not self._spec:
             return "仕様書が見つかりませんでした。"
 
-        spec = doc.specification
+        spec = self._spec
 
         # カテゴリに関連する部分を抽出
-        if task_category:
+        # （仕様書のどこにもカテゴリ名が出てこなければ行単位の走査自体を省く）
+        if task_category and task_category.lower() in self._spec_lower:
+            if task_category in self._flows:
+                return self._flows[task_category]
+
             lines = spec.split('\n')
             relevant_lines = []
             in_relevant_section = False
+            category_lower = task_category.lower()
+            # '\n'.join(relevant_lines) の長さ（区切りは行の間にだけ入るので -1 から数える）
+            total_len = -1
 
             for line in lines:
+                mentions_category = category_lower in line.lower()
+
                 # セクション開始
-                if task_category.lower() in line.lower():
+                if mentions_category:
                     in_relevant_section = True
 
                 if in_relevant_section:
                     relevant_lines.append(line)
+                    total_len += len(line) + 1
 
                     # 次のセクション開始で終了
-                    if line.startswith('##') and task_category.lower() not in line.lower():
+                    if line.startswith('##') and not mentions_category:
                         in_relevant_section = False
 
-                # 2000文字で打ち切り
-                if len('\n'.join(relevant_lines)) > 2000:
-                    break
+                    # 2000文字で打ち切り
+                    if total_len > 2000:
+                        break
 
             if relevant_lines:
-                return '\n'.join(relevant_lines)
+                flow = '\n'.join(relevant_lines)
+                self._flows[task_category] = flow
+                return flow
 
         # カテゴリ指定なしまたは見つからない場合は全体から抜粋
         return spec[:2000]
@@ -4,12 +4,100 @@ WebSearchTool: Tavily API を使用した Web 検索ツール
 Phase 3: タスクハンズオン生成のための最新情報検索
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from collections import OrderedDict
 import os
+import copy
+import json
+import time
+import hashlib
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 
+# 技術名 → 公式ドキュメントのドメイン（キーは _TECH_NAME_STRIP で正規化済み）
+_TECH_NAME_STRIP = str.maketrans("", "", " .")
+_OFFICIAL_DOMAINS: Dict[str, tuple] = {
+    name.translate(_TECH_NAME_STRIP): domains
+    for name, domains in {
+        "next.js": ("nextjs.org",),
+        "react": ("react.dev", "reactjs.org"),
+        "fastapi": ("fastapi.tiangolo.com",),
+        "django": ("docs.djangoproject.com",),
+        "flask": ("flask.palletsprojects.com",),
+        "postgresql": ("postgresql.org",),
+        "redis": ("redis.io",),
+        "python": ("docs.python.org", "python.org"),
+        "typescript": ("typescriptlang.org",),
+        "node.js": ("nodejs.org",),
+        "tailwind": ("tailwindcss.com",),
+        "langchain": ("python.langchain.com",),
+        "celery": ("docs.celeryq.dev",),
+    }.items()
+}
+
+
+# 用途別ヘルパーの検索クエリ（同じ引数なら同じクエリ文字列になり、検索キャッシュに当たる）
+_TECH_DOCS_QUERY = "{technology} {topic} official documentation best practices{year}"
+_CODE_EXAMPLES_QUERY = "{technology} {task_description} code example tutorial"
+_TROUBLESHOOTING_QUERY = "{technology} error {error_message} solution fix"
+
+class _SearchCache:
+    """
+    検索結果のプロセス内LRUキャッシュ（ツールのインスタンス間で共有）
+
+    同じプロジェクトのタスク間ではほぼ同じ検索が繰り返されるため、
+    ペイロード（クエリ・深さ・ドメイン指定など）が同じ検索は ttl 秒間APIを呼ばずに返す。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(payload: Dict) -> bytes:
+        # APIキーは結果に影響しないのでキーから除く
+        params = {k: v for k, v in payload.items() if k != "api_key"}
+        return hashlib.blake2b(
+            json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"),
+            digest_size=16
+        ).digest()
+
+    def get(self, key: bytes) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, results = entry
+            if time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # 呼び出し側が結果を書き換えてもキャッシュに影響しないようにコピーを返す
+        return copy.deepcopy(results)
+
+    def put(self, key: bytes, results: List[Dict]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_SEARCH_CACHE = _SearchCache(
+    maxsize=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("WEB_SEARCH_CACHE_TTL", "3600")),
+)
+
 class WebSearchTool:
     """
     Tavily API を使用した Web 検索ツール
@@ -34,6 +122,22 @@ class WebSearchTool:
         self.base_url = "https://api.tavily.com/search"
         self.default_max_results = 5
 
+        # 検索のたびにTCP/TLSハンドシェイクしないよう、接続を使い回す
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),  # 検索は冪等なのでPOSTも再試行する
+                raise_on_status=False,  # 再試行後のステータスは raise_for_status で扱う
+            ),
+        )
+        self.session.mount("https://", adapter)
+
     def search(
         self,
         query: str,
@@ -72,32 +176,24 @@ class WebSearchTool:
             requests.exceptions.RequestException: API呼び出しエラー
             ValueError: 不正なパラメータ
         """
-        if not query or not query.strip():
-            raise ValueError("Search query cannot be empty")
-
-        if search_depth not in ["basic", "advanced"]:
-            raise ValueError("search_depth must be 'basic' or 'advanced'")
-
-        # リクエストペイロード構築
-        payload = {
-            "api_key": self.api_key,
-            "query": query,
-            "max_results": max_results,
-            "search_depth": search_depth,
-            "include_raw_content": include_raw_content,
-        }
-
-        if include_domains:
-            payload["include_domains"] = include_domains
+        payload = self._build_payload(
+            query,
+            max_results,
+            search_depth,
+            include_domains,
+            exclude_domains,
+            include_raw_content
+        )
 
-        if exclude_domains:
-            payload["exclude_domains"] = exclude_domains
+        cache_key = _SEARCH_CACHE.key(payload)
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.base_url,
                 json=payload,
-                headers={"Content-Type": "application/json"},
                 timeout=30
             )
             response.raise_for_status()
@@ -106,6 +202,7 @@ class WebSearchTool:
 
             # 結果を整形
             formatted_results = self._format_results(result.get("results", []))
+            _SEARCH_CACHE.put(cache_key, formatted_results)
 
             return formatted_results
 
@@ -129,6 +226,38 @@ class WebSearchTool:
                 f"Unexpected error during Tavily API call: {e}"
             )
 
+    def _build_payload(
+        self,
+        query: str,
+        max_results: int,
+        search_depth: str,
+        include_domains: Optional[List[str]],
+        exclude_domains: Optional[List[str]],
+        include_raw_content: bool
+    ) -> Dict:
+        """パラメータを検証し、Tavily API へのリクエストペイロードを構築"""
+        if not query or not query.strip():
+            raise ValueError("Search query cannot be empty")
+
+        if search_depth not in ["basic", "advanced"]:
+            raise ValueError("search_depth must be 'basic' or 'advanced'")
+
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "max_results": max_results,
+            "search_depth": search_depth,
+            "include_raw_content": include_raw_content,
+        }
+
+        if include_domains:
+            payload["include_domains"] = include_domains
+
+        if exclude_domains:
+            payload["exclude_domains"] = exclude_domains
+
+        return payload
+
     def _format_results(self, raw_results: List[Dict]) -> List[Dict]:
         """
         Tavily API の結果を統一フォーマットに整形
@@ -139,24 +268,18 @@ class WebSearchTool:
         Returns:
             整形された結果
         """
-        formatted = []
-
-        for result in raw_results:
-            formatted_result = {
+        return [
+            {
                 "title": result.get("title", "No Title"),
                 "url": result.get("url", ""),
-                "content": result.get("content", "")[:500],  # 最大500文字
+                "content": (result.get("content") or "")[:500],  # 最大500文字
                 "score": result.get("score", 0.0),
                 "published_date": result.get("published_date"),
+                # raw_content が含まれている場合は追加
+                **({"raw_content": result["raw_content"]} if "raw_content" in result else {}),
             }
-
-            # raw_content が含まれている場合は追加
-            if "raw_content" in result:
-                formatted_result["raw_content"] = result["raw_content"]
-
-            formatted.append(formatted_result)
-
-        return formatted
+            for result in raw_results
+        ]
 
     def search_technical_docs(
         self,
@@ -183,8 +306,11 @@ class WebSearchTool:
             ...     year=2025
             ... )
         """
-        year_str = f" {year}" if year else ""
-        query = f"{technology} {topic} official documentation best practices{year_str}"
+        query = _TECH_DOCS_QUERY.format(
+            technology=technology,
+            topic=topic,
+            year=f" {year}" if year else ""
+        )
 
         # 公式ドキュメントを優先
         official_domains = self._get_official_domains(technology)
@@ -206,29 +332,17 @@ class WebSearchTool:
         Returns:
             公式ドメインのリスト（見つからない場合はNone）
         """
-        official_domains_map = {
-            "next.js": ["nextjs.org"],
-            "react": ["react.dev", "reactjs.org"],
-            "fastapi": ["fastapi.tiangolo.com"],
-            "django": ["docs.djangoproject.com"],
-            "flask": ["flask.palletsprojects.com"],
-            "postgresql": ["postgresql.org"],
-            "redis": ["redis.io"],
-            "python": ["docs.python.org", "python.org"],
-            "typescript": ["typescriptlang.org"],
-            "node.js": ["nodejs.org"],
-            "tailwind": ["tailwindcss.com"],
-            "langchain": ["python.langchain.com"],
-            "celery": ["docs.celeryq.dev"],
-        }
+        tech_key = technology.lower().translate(_TECH_NAME_STRIP)
 
-        tech_lower = technology.lower().replace(" ", "").replace(".", "")
+        domains = _OFFICIAL_DOMAINS.get(tech_key)
+        if domains is None:
+            # 完全一致しない場合のみ部分一致で探す（例: "Next.js 15" → "nextjs"）
+            for key, candidate in _OFFICIAL_DOMAINS.items():
+                if tech_key in key or key in tech_key:
+                    domains = candidate
+                    break
 
-        for key, domains in official_domains_map.items():
-            if tech_lower in key or key in tech_lower:
-                return domains
-
-        return None
+        return list(domains) if domains else None
 
     def search_code_examples(
         self,
@@ -252,7 +366,10 @@ class WebSearchTool:
             ...     task_description="user authentication with JWT"
             ... )
         """
-        query = f"{technology} {task_description} code example tutorial"
+        query = _CODE_EXAMPLES_QUERY.format(
+            technology=technology,
+            task_description=task_description
+        )
 
         return self.search(
             query=query,
@@ -282,7 +399,10 @@ class WebSearchTool:
             ...     error_message="connection refused"
             ... )
         """
-        query = f"{technology} error {error_message} solution fix"
+        query = _TROUBLESHOOTING_QUERY.format(
+            technology=technology,
+            error_message=error_message
+        )
 
         # Stack Overflow などの技術Q&Aサイトを優先
         tech_qa_domains = [
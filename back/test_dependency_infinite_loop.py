@@ -4,8 +4,17 @@
 機能間依存関係のロジックが無限ループを引き起こすか検証
 """
 import asyncio
-from services.task import TaskDependencyService
-from database import SessionLocal
+import copy
+import os
+
+import pytest
+
+# 実際のDBとGemini呼び出しを使う結合テスト（APIキーやDBの設定がない環境ではスキップ）
+# database / services はインポート時にDB接続を作るため、テスト内でインポートする
+pytestmark = pytest.mark.skipif(
+    not (os.getenv("GOOGLE_API_KEY") and os.getenv("DATABASE_URL")),
+    reason="integration test: requires GOOGLE_API_KEY and a database",
+)
 
 
 # テストデータ: 2つの機能、各3タスク
@@ -27,57 +36,36 @@ test_functions = [
 ]
 
 
-async def test_infinite_loop():
-    """無限ループテスト"""
-    db = SessionLocal()
+async def _generate_dependencies():
+    from database import SessionLocal
+    from services.task import TaskDependencyService
 
+    db = SessionLocal()
     try:
-        print("=" * 80)
-        print("無限ループテスト開始")
-        print("=" * 80)
-
         service = TaskDependencyService(db)
+        # サービスは depends_on を書き換えるため、テストデータはコピーして渡す
+        return await service.generate_dependencies(copy.deepcopy(test_tasks), test_functions)
+    finally:
+        db.close()
 
-        # generate_dependencies を呼び出す
-        print("\n依存関係生成開始...")
-        tasks_with_deps, edges = await service.generate_dependencies(test_tasks, test_functions)
-
-        print("\n" + "=" * 80)
-        print("✅ テスト完了（無限ループは発生しなかった）")
-        print("=" * 80)
-
-        print(f"\n総タスク数: {len(tasks_with_deps)}")
-        print(f"総エッジ数: {len(edges)}")
 
-        print("\n各タスクの依存関係:")
-        for task in tasks_with_deps:
-            deps = task.get("depends_on", [])
-            print(f"  {task['node_id']}: {deps} ({len(deps)}個の依存)")
+def test_infinite_loop():
+    """無限ループテスト（30秒以内に依存関係生成が終わること）"""
+    tasks_with_deps, edges = asyncio.run(
+        asyncio.wait_for(_generate_dependencies(), timeout=30.0)
+    )
 
-        print("\nエッジ一覧:")
-        for edge in edges:
-            print(f"  {edge['source_node_id']} -> {edge['target_node_id']}")
+    assert len(tasks_with_deps) == len(test_tasks)
 
-    except KeyboardInterrupt:
-        print("\n\n" + "=" * 80)
-        print("❌ 無限ループ検出: Ctrl+Cで中断されました")
-        print("=" * 80)
-
-    except Exception as e:
-        print(f"\n❌ エラー: {e}")
-        import traceback
-        traceback.print_exc()
-
-    finally:
-        db.close()
+    node_ids = {task["node_id"] for task in tasks_with_deps}
+    for task in tasks_with_deps:
+        deps = task.get("depends_on", [])
+        assert len(deps) == len(set(deps)), f"{task['node_id']} に重複した依存があります"
+        assert task["node_id"] not in deps
+    for edge in edges:
+        assert edge["source_node_id"] in node_ids
+        assert edge["target_node_id"] in node_ids
 
 
 if __name__ == "__main__":
-    # タイムアウトを設定（30秒で強制終了）
-    try:
-        asyncio.run(asyncio.wait_for(test_infinite_loop(), timeout=30.0))
-    except asyncio.TimeoutError:
-        print("\n" + "=" * 80)
-        print("❌ タイムアウト: 30秒以内に処理が完了しませんでした")
-        print("無限ループまたは非常に遅い処理が発生している可能性があります")
-        print("=" * 80)
+    test_infinite_loop()
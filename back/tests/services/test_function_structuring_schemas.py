@@ -9,7 +9,8 @@ Tests Pydantic models for:
 
 import pytest
 import uuid
-from pydantic import ValidationError
+from typing import Final
+from pydantic import TypeAdapter, ValidationError
 
 from services.function.function_structuring_schemas import (
     FunctionCategory,
@@ -29,30 +30,65 @@ from services.function.function_structuring_schemas import (
 )
 
 
+# Reused validator for the ValidationError tests
+_EXTRACTED_TA = TypeAdapter(ExtractedFunction)
+
+# Enum value sets (computed once at import)
+_CATEGORY_VALUES: Final[frozenset] = frozenset(cat.value for cat in FunctionCategory)
+_PRIORITY_VALUES: Final[frozenset] = frozenset(pri.value for pri in FunctionPriority)
+_DEPENDENCY_TYPE_VALUES: Final[frozenset] = frozenset(dep.value for dep in DependencyType)
+
+# Shared description fixtures (built once at import)
+_LONG_DESC_AUTH: Final[str] = (
+    "メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）、"
+    "既存ユーザー重複チェック、bcryptによるパスワードハッシュ化を実装。POST /api/users エンドポイントとして公開。"
+)
+_LONG_DESC_UI: Final[str] = (
+    "ユーザーのプロジェクト一覧を表示する画面コンポーネント。カード形式のUI、フィルタリング機能、"
+    "ページネーション、新規作成ボタンを含む。レスポンシブデザイン対応。"
+)
+_MEDIUM_DESC_AUTH: Final[str] = "メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）を実装。"
+_SHORT_DESC_AUTH: Final[str] = "メールアドレスとパスワードでユーザーを新規登録する。"
+# 50 characters or more, valid for ExtractedFunction.description
+_DESC_BLOCK: Final[str] = "これは50文字以上の説明です。" * 5
+
+
+# Fixture builders for the wrapper-model tests, whose inputs are known-valid literals.
+# model_construct() skips validation entirely (and keeps Enum members as-is), so tests
+# of validation, defaults, enum conversion and the conversion helpers keep the
+# validating constructors.
+def _make_extracted(**kw) -> ExtractedFunction:
+    return ExtractedFunction.model_construct(**kw)
+
+
+def _make_structured(**kw) -> StructuredFunction:
+    return StructuredFunction.model_construct(**kw)
+
+
+def _make_dependency(**kw) -> FunctionDependency:
+    return FunctionDependency.model_construct(**kw)
+
+
 class TestEnums:
     """Test Enum definitions and DB compatibility"""
 
     def test_function_category_values(self):
         """Test FunctionCategory enum matches DB CHECK constraint"""
-        expected_values = {"auth", "data", "logic", "ui", "api", "deployment"}
-        actual_values = {cat.value for cat in FunctionCategory}
-        assert actual_values == expected_values, "FunctionCategory enum must match DB constraint"
+        expected_values = frozenset({"auth", "data", "logic", "ui", "api", "deployment"})
+        assert _CATEGORY_VALUES == expected_values, "FunctionCategory enum must match DB constraint"
 
     def test_function_priority_values(self):
         """Test FunctionPriority enum matches DB CHECK constraint (no apostrophe)"""
-        expected_values = {"Must", "Should", "Could", "Wont"}  # NO apostrophe in Wont
-        actual_values = {pri.value for pri in FunctionPriority}
-        assert actual_values == expected_values, "FunctionPriority enum must match DB constraint"
+        expected_values = frozenset({"Must", "Should", "Could", "Wont"})  # NO apostrophe in Wont
+        assert _PRIORITY_VALUES == expected_values, "FunctionPriority enum must match DB constraint"
 
         # Ensure "Won't" is NOT in the enum
-        priority_values = [pri.value for pri in FunctionPriority]
-        assert "Won't" not in priority_values, "Priority must be 'Wont' not 'Won't'"
+        assert "Won't" not in _PRIORITY_VALUES, "Priority must be 'Wont' not 'Won't'"
 
     def test_dependency_type_values(self):
         """Test DependencyType enum values"""
-        expected_values = {"requires", "blocks", "relates"}
-        actual_values = {dep.value for dep in DependencyType}
-        assert actual_values == expected_values, "DependencyType enum values are correct"
+        expected_values = frozenset({"requires", "blocks", "relates"})
+        assert _DEPENDENCY_TYPE_VALUES == expected_values, "DependencyType enum values are correct"
 
     def test_dependency_type_default(self):
         """Test default dependency type is 'requires'"""
@@ -66,7 +102,7 @@ class TestExtractedFunction:
         """Test creating a valid ExtractedFunction"""
         func = ExtractedFunction(
             function_name="ユーザー登録API",
-            description="メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）、既存ユーザー重複チェック、bcryptによるパスワードハッシュ化を実装。POST /api/users エンドポイントとして公開。",
+            description=_LONG_DESC_AUTH,
             estimated_category=FunctionCategory.AUTH,
             text_position=1
         )
@@ -77,36 +113,36 @@ class TestExtractedFunction:
     def test_description_min_length_validation(self):
         """Test description must be at least 50 characters"""
         with pytest.raises(ValidationError) as exc_info:
-            ExtractedFunction(
-                function_name="Test",
-                description="短すぎる説明",  # Less than 50 chars
-                estimated_category=FunctionCategory.AUTH,
-                text_position=1
-            )
+            _EXTRACTED_TA.validate_python({
+                "function_name": "Test",
+                "description": "短すぎる説明",  # Less than 50 chars
+                "estimated_category": FunctionCategory.AUTH,
+                "text_position": 1,
+            })
         errors = exc_info.value.errors()
         assert any(err["loc"] == ("description",) for err in errors), "Description validation failed"
 
     def test_function_name_max_length_validation(self):
         """Test function_name must not exceed 200 characters"""
         with pytest.raises(ValidationError) as exc_info:
-            ExtractedFunction(
-                function_name="あ" * 201,  # Exceeds 200 chars
-                description="これは50文字以上の説明です。" * 5,
-                estimated_category=FunctionCategory.AUTH,
-                text_position=1
-            )
+            _EXTRACTED_TA.validate_python({
+                "function_name": "あ" * 201,  # Exceeds 200 chars
+                "description": _DESC_BLOCK,
+                "estimated_category": FunctionCategory.AUTH,
+                "text_position": 1,
+            })
         errors = exc_info.value.errors()
         assert any(err["loc"] == ("function_name",) for err in errors), "Function name length validation failed"
 
     def test_text_position_validation(self):
         """Test text_position must be >= 0"""
         with pytest.raises(ValidationError) as exc_info:
-            ExtractedFunction(
-                function_name="Test",
-                description="これは50文字以上の説明です。" * 3,
-                estimated_category=FunctionCategory.AUTH,
-                text_position=-1  # Invalid: negative
-            )
+            _EXTRACTED_TA.validate_python({
+                "function_name": "Test",
+                "description": _DESC_BLOCK,
+                "estimated_category": FunctionCategory.AUTH,
+                "text_position": -1,  # Invalid: negative
+            })
         errors = exc_info.value.errors()
         assert any(err["loc"] == ("text_position",) for err in errors), "Text position validation failed"
 
@@ -118,7 +154,7 @@ class TestStructuredFunction:
         """Test creating a valid StructuredFunction"""
         func = StructuredFunction(
             function_name="ユーザー登録API",
-            description="メールアドレスとパスワードでユーザーを新規登録する。",
+            description=_SHORT_DESC_AUTH,
             category=FunctionCategory.AUTH,
             priority=FunctionPriority.MUST,
             dependencies=["データベース初期化"],
@@ -260,7 +296,7 @@ class TestHelperFunctions:
         """Test converting ExtractedFunction to StructuredFunction"""
         extracted = ExtractedFunction(
             function_name="ユーザー登録API",
-            description="メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）、既存ユーザー重複チェック、bcryptによるパスワードハッシュ化を実装。POST /api/users エンドポイントとして公開。",
+            description=_LONG_DESC_AUTH,
             estimated_category=FunctionCategory.AUTH,
             text_position=1
         )
@@ -283,7 +319,7 @@ class TestHelperFunctions:
         """Test converting StructuredFunction to StructuredFunctionDB"""
         structured = StructuredFunction(
             function_name="ユーザー登録API",
-            description="メールアドレスとパスワードでユーザーを新規登録する。",
+            description=_SHORT_DESC_AUTH,
             category=FunctionCategory.AUTH,
             priority=FunctionPriority.MUST,
             confidence=0.9,
@@ -298,6 +334,7 @@ class TestHelperFunctions:
             source_doc_id=source_doc_id
         )
 
+        assert isinstance(db_model, StructuredFunctionDB)
         assert db_model.function_code == "F001"
         assert db_model.function_name == structured.function_name
         assert db_model.description == structured.description
@@ -307,21 +344,39 @@ class TestHelperFunctions:
         assert db_model.order_index == 0
         assert db_model.source_doc_id == source_doc_id
 
+    def test_structured_to_db_validates_caller_fields(self):
+        """Test structured_to_db validates function_code and order_index"""
+        structured = StructuredFunction(
+            function_name="ユーザー登録API",
+            description=_SHORT_DESC_AUTH,
+            category=FunctionCategory.AUTH,
+            priority=FunctionPriority.MUST,
+            text_position=1
+        )
+
+        # Invalid: function_code > 20 chars
+        with pytest.raises(ValidationError):
+            structured_to_db(structured=structured, function_code="F" * 21, order_index=0)
+
+        # Invalid: order_index is not an integer
+        with pytest.raises(ValidationError):
+            structured_to_db(structured=structured, function_code="F001", order_index="first")
+
 
 class TestWrapperModels:
     """Test wrapper models for LLM structured output"""
 
     def test_function_extraction_output(self):
         """Test FunctionExtractionOutput wrapper"""
-        func1 = ExtractedFunction(
+        func1 = _make_extracted(
             function_name="機能1",
-            description="メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）、既存ユーザー重複チェック、bcryptによるパスワードハッシュ化を実装。POST /api/users エンドポイントとして公開。",
+            description=_LONG_DESC_AUTH,
             estimated_category=FunctionCategory.AUTH,
             text_position=1
         )
-        func2 = ExtractedFunction(
+        func2 = _make_extracted(
             function_name="機能2",
-            description="ユーザーのプロジェクト一覧を表示する画面コンポーネント。カード形式のUI、フィルタリング機能、ページネーション、新規作成ボタンを含む。レスポンシブデザイン対応。",
+            description=_LONG_DESC_UI,
             estimated_category=FunctionCategory.UI,
             text_position=2
         )
@@ -332,13 +387,13 @@ class TestWrapperModels:
 
     def test_structured_function_output(self):
         """Test StructuredFunctionOutput wrapper"""
-        func1 = StructuredFunction(
+        func1 = _make_structured(
             function_name="機能1",
             description="説明",
             category=FunctionCategory.AUTH,
             priority=FunctionPriority.MUST
         )
-        func2 = StructuredFunction(
+        func2 = _make_structured(
             function_name="機能2",
             description="説明",
             category=FunctionCategory.UI,
@@ -350,12 +405,12 @@ class TestWrapperModels:
 
     def test_dependency_analysis_output(self):
         """Test DependencyAnalysisOutput wrapper"""
-        dep1 = FunctionDependency(
+        dep1 = _make_dependency(
             from_function="A",
             to_function="B",
             dependency_type=DependencyType.REQUIRES
         )
-        dep2 = FunctionDependency(
+        dep2 = _make_dependency(
             from_function="B",
             to_function="C",
             dependency_type=DependencyType.BLOCKS
@@ -373,7 +428,7 @@ class TestEnumValueConversion:
         """Test ExtractedFunction converts Enum to string"""
         func = ExtractedFunction(
             function_name="Test",
-            description="メールアドレスとパスワードでユーザーを新規登録する。入力バリデーション（メール形式、パスワード8文字以上）を実装。",
+            description=_MEDIUM_DESC_AUTH,
             estimated_category=FunctionCategory.AUTH,
             text_position=1
         )
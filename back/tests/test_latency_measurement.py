@@ -20,32 +20,80 @@ Usage:
 
     # テスト実行
     python tests/test_latency_measurement.py <project_id>
+
+    # 並行に計測する場合（帯域・クォータを取り合うためTTFTは参考値）
+    python tests/test_latency_measurement.py <project_id> 5 --concurrent
 """
 
 import os
 import sys
 import time
 import asyncio
-import statistics
+import logging
+import logging.handlers
+import queue
 from dataclasses import dataclass, field
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional
 import json
 
 # パスを追加してservicesをインポート可能にする
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import httpx
+import numpy as np
+import pytest
 from dotenv import load_dotenv
 
-# .env読み込み
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env.local"))
-load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+# 手動実行用のネットワークベンチマーク（pytest では収集のみでスキップ）
+pytestmark = pytest.mark.skip(reason="manual benchmark script; run with python")
+
+# 結果JSONの書き出し用（未インストールなら標準の json を使う）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 計測中の進捗ログ（__main__ で QueueListener を介して出力し、計測区間でI/Oを行わない）
+logger = logging.getLogger("latency")
 
 # Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
+# レート制限対策: 429 / ResourceExhausted を観測したときだけバックオフし、
+# それ以外は最小限の間隔で次の呼び出しへ進む
+MIN_CALL_INTERVAL_SECONDS = 0.2
+RATE_LIMIT_BACKOFF_SECONDS = 3.0
+
+# バックオフ終了時刻（time.monotonic() 基準）
+_rate_limited_until = 0.0
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    """Google API の ResourceExhausted / HTTP 429 かどうか"""
+    if type(e).__name__ == "ResourceExhausted":
+        return True
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429
+    return "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e)
+
 
-@dataclass
+def _note_rate_limit(retry_after: Optional[float] = None) -> None:
+    """レート制限を記録し、次の呼び出しまでのバックオフ期限を延ばす"""
+    global _rate_limited_until
+    wait = retry_after if retry_after is not None else RATE_LIMIT_BACKOFF_SECONDS
+    _rate_limited_until = max(_rate_limited_until, time.monotonic() + wait)
+    logger.info("  [RateLimit] Rate limited, backing off %.1fs", wait)
+
+
+async def _wait_for_rate_limit() -> None:
+    """直前にレート制限を受けていればその期限まで、そうでなければ最小間隔だけ待つ"""
+    remaining = _rate_limited_until - time.monotonic()
+    await asyncio.sleep(max(MIN_CALL_INTERVAL_SECONDS, remaining))
+
+
+@dataclass(slots=True)
 class StreamingMetrics:
     """LLMストリーミング計測結果"""
     ttft_ms: float = 0.0  # Time To First Token
@@ -54,7 +102,7 @@ class StreamingMetrics:
     tokens_per_second: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class APIMetrics:
     """API計測結果"""
     ttfb_ms: float = 0.0  # Time To First Byte
@@ -62,7 +110,7 @@ class APIMetrics:
     response_size: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class LatencyComparison:
     """TTFT vs TTFB 比較結果"""
     streaming: StreamingMetrics
@@ -81,17 +129,8 @@ class LatencyComparison:
         return (self.potential_improvement_ms / self.api.ttfb_ms) * 100
 
 
-async def measure_llm_streaming_ttft(prompt: str) -> StreamingMetrics:
-    """
-    LLMのストリーミングAPIを直接呼び出してTTFTを計測
-
-    これにより「LLM自体は何msで最初のトークンを返せるか」を測定
-    """
-    from langchain_google_genai import ChatGoogleGenerativeAI
-    from langchain.prompts import ChatPromptTemplate
-
-    # question_serviceと同じプロンプトテンプレートを使用
-    template = """あなたはハッカソンのコーチです。
+# question_serviceと同じプロンプトテンプレートを使用
+QUESTION_PROMPT_TEMPLATE = """あなたはハッカソンのコーチです。
 アイデアをより具体化するために質問を作成してください。
 
 以下のアイデアに対して、プロダクトの要件を明確にするための質問を5つ作成してください。
@@ -111,42 +150,72 @@ async def measure_llm_streaming_ttft(prompt: str) -> StreamingMetrics:
 ```
 """
 
-    prompt_template = ChatPromptTemplate.from_template(template)
-    formatted_prompt = prompt_template.format(idea_prompt=prompt)
+# 反復計測ごとにテンプレート解析・クライアント生成をしないよう、初回呼び出し時に一度だけ構築する
+_prompt_template = None
+_streaming_llm = None
+
 
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        temperature=0.5,
-        api_key=os.getenv("GOOGLE_API_KEY"),
-        streaming=True,
-    )
+def _get_streaming_llm():
+    """計測用のプロンプトテンプレートとストリーミングLLMを返す（初回のみ生成）"""
+    global _prompt_template, _streaming_llm
+    if _streaming_llm is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        from langchain.prompts import ChatPromptTemplate
+
+        _prompt_template = ChatPromptTemplate.from_template(QUESTION_PROMPT_TEMPLATE)
+        _streaming_llm = ChatGoogleGenerativeAI(
+            model="gemini-2.5-flash",
+            temperature=0.5,
+            api_key=os.getenv("GOOGLE_API_KEY"),
+            streaming=True,
+        )
+    return _prompt_template, _streaming_llm
+
+
+@lru_cache(maxsize=32)
+def _render_question_prompt(prompt: str) -> str:
+    """プロンプトを描画する（ChatPromptTemplate.format は純粋なので同じ入力の結果を再利用できる）"""
+    prompt_template, _ = _get_streaming_llm()
+    return prompt_template.format(idea_prompt=prompt)
+
+
+async def measure_llm_streaming_ttft(prompt: str) -> StreamingMetrics:
+    """
+    LLMのストリーミングAPIを直接呼び出してTTFTを計測
+
+    これにより「LLM自体は何msで最初のトークンを返せるか」を測定
+    """
+    _, llm = _get_streaming_llm()
+    formatted_prompt = _render_question_prompt(prompt)
 
     metrics = StreamingMetrics()
-    start_time = time.perf_counter()
-    first_token_time = None
+    start_ns = time.perf_counter_ns()
+    first_token_ns = None
     token_count = 0
 
-    print("  [Streaming] Starting LLM stream...")
-
-    async for chunk in llm.astream(formatted_prompt):
-        current_time = time.perf_counter()
+    logger.info("  [Streaming] Starting LLM stream...")
 
-        if first_token_time is None:
-            first_token_time = current_time
-            metrics.ttft_ms = (first_token_time - start_time) * 1000
-            print(f"  [Streaming] First token received at {metrics.ttft_ms:.2f} ms")
+    try:
+        async for chunk in llm.astream(formatted_prompt):
+            if first_token_ns is None:
+                first_token_ns = time.perf_counter_ns()
+                metrics.ttft_ms = (first_token_ns - start_ns) / 1e6
+                logger.info("  [Streaming] First token received at %.2f ms", metrics.ttft_ms)
 
-        token_count += 1
+            token_count += 1
+    except Exception as e:
+        if _is_rate_limit_error(e):
+            _note_rate_limit()
+        raise
 
-    end_time = time.perf_counter()
-    metrics.ttlt_ms = (end_time - start_time) * 1000
+    metrics.ttlt_ms = (time.perf_counter_ns() - start_ns) / 1e6
     metrics.token_count = token_count
 
     if metrics.ttlt_ms > metrics.ttft_ms:
         generation_time = (metrics.ttlt_ms - metrics.ttft_ms) / 1000
         metrics.tokens_per_second = token_count / generation_time if generation_time > 0 else 0
 
-    print(f"  [Streaming] Last token at {metrics.ttlt_ms:.2f} ms ({token_count} chunks)")
+    logger.info("  [Streaming] Last token at %.2f ms (%d chunks)", metrics.ttlt_ms, token_count)
 
     return metrics
 
@@ -162,9 +231,9 @@ async def measure_api_ttfb(project_id: str, prompt: str, timeout: float = 120.0)
 
     metrics = APIMetrics()
 
-    print(f"  [API] Calling POST {url}")
+    logger.info("  [API] Calling POST %s", url)
 
-    start_time = time.perf_counter()
+    start_ns = time.perf_counter_ns()
 
     async with httpx.AsyncClient(timeout=timeout) as client:
         async with client.stream(
@@ -173,24 +242,25 @@ async def measure_api_ttfb(project_id: str, prompt: str, timeout: float = 120.0)
             json=payload,
             headers={"Content-Type": "application/json"}
         ) as response:
-            first_byte_time = None
-            chunks = []
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                _note_rate_limit(float(retry_after) if retry_after and retry_after.isdigit() else None)
 
-            async for chunk in response.aiter_bytes():
-                current_time = time.perf_counter()
+            first_byte_ns = None
+            response_size = 0
 
-                if first_byte_time is None:
-                    first_byte_time = current_time
-                    metrics.ttfb_ms = (first_byte_time - start_time) * 1000
-                    print(f"  [API] First byte received at {metrics.ttfb_ms:.2f} ms")
+            async for chunk in response.aiter_bytes():
+                if first_byte_ns is None:
+                    first_byte_ns = time.perf_counter_ns()
+                    metrics.ttfb_ms = (first_byte_ns - start_ns) / 1e6
+                    logger.info("  [API] First byte received at %.2f ms", metrics.ttfb_ms)
 
-                chunks.append(chunk)
+                response_size += len(chunk)
 
-            end_time = time.perf_counter()
-            metrics.total_ms = (end_time - start_time) * 1000
-            metrics.response_size = sum(len(c) for c in chunks)
+            metrics.total_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            metrics.response_size = response_size
 
-    print(f"  [API] Response complete at {metrics.total_ms:.2f} ms ({metrics.response_size} bytes)")
+    logger.info("  [API] Response complete at %.2f ms (%d bytes)", metrics.total_ms, metrics.response_size)
 
     return metrics
 
@@ -199,30 +269,27 @@ async def compare_ttft_vs_ttfb(project_id: str, prompt: str) -> LatencyCompariso
     """
     TTFT（ストリーミング）とTTFB（現在のAPI）を比較
     """
-    print("\n" + "="*70)
-    print("TTFT vs TTFB Comparison")
-    print("="*70)
-    print(f"\nPrompt: {prompt[:100]}...")
-    print()
+    logger.info("\n%s\nTTFT vs TTFB Comparison\n%s", "="*70, "="*70)
+    logger.info("\nPrompt: %s...\n", prompt[:100])
 
     # 1. ストリーミングでTTFTを計測
-    print("[1/2] Measuring TTFT (LLM Streaming)...")
+    logger.info("[1/2] Measuring TTFT (LLM Streaming)...")
     streaming_metrics = await measure_llm_streaming_ttft(prompt)
 
-    print()
+    logger.info("")
 
-    # API rate limit対策
-    await asyncio.sleep(2)
+    # API rate limit対策（429を受けたときだけバックオフ）
+    await _wait_for_rate_limit()
 
     # 2. 現在のAPIでTTFBを計測
-    print("[2/2] Measuring TTFB (Current API)...")
+    logger.info("[2/2] Measuring TTFB (Current API)...")
     try:
         api_metrics = await measure_api_ttfb(project_id, prompt)
     except httpx.ConnectError:
-        print("  [API] ERROR: Backend server not running")
+        logger.error("  [API] ERROR: Backend server not running")
         api_metrics = APIMetrics()
     except Exception as e:
-        print(f"  [API] ERROR: {e}")
+        logger.error("  [API] ERROR: %s", e)
         api_metrics = APIMetrics()
 
     comparison = LatencyComparison(streaming=streaming_metrics, api=api_metrics)
@@ -290,55 +357,84 @@ def print_comparison_report(comparison: LatencyComparison):
     print("\n" + "="*70)
 
 
-async def run_benchmark(project_id: str, prompt: str, iterations: int = 3) -> dict:
+# run_benchmark の計測値レイアウト（1反復 = 1行）
+_BENCHMARK_DTYPE = [("ttft", "f8"), ("ttlt", "f8"), ("ttfb", "f8"), ("imp", "f8")]
+
+
+async def run_benchmark(
+    project_id: str,
+    prompt: str,
+    iterations: int = 3,
+    concurrency: int = 4,
+    sequential: bool = True,
+) -> dict:
     """
     複数回計測してベンチマーク結果を返す
+
+    既定では1回ずつ（レート制限時はバックオフして）実行する（同時に流すと帯域・APIクォータを
+    取り合い、計測したいTTFT/TTFBそのものが歪むため）。sequential=False なら最大 concurrency 件を並行実行する。
     """
-    results: List[LatencyComparison] = []
+    # 計測値は指標ごとの列（構造化配列）へ直接書き込む
+    arr = np.zeros(iterations, dtype=_BENCHMARK_DTYPE)
 
     print(f"\n{'#'*70}")
-    print(f"# LATENCY BENCHMARK ({iterations} iterations)")
+    mode = "sequential" if sequential else f"concurrency={concurrency}"
+    print(f"# LATENCY BENCHMARK ({iterations} iterations, {mode})")
     print(f"{'#'*70}")
 
-    for i in range(iterations):
-        print(f"\n>>> Iteration {i+1}/{iterations}")
+    started = 0
+
+    async def _run_one(i: int) -> None:
+        nonlocal started
+        started += 1
+        logger.info("\n>>> Iteration %d/%d", started, iterations)
 
         comparison = await compare_ttft_vs_ttfb(project_id, prompt)
-        results.append(comparison)
+        arr[i] = (
+            comparison.streaming.ttft_ms,
+            comparison.streaming.ttlt_ms,
+            comparison.api.ttfb_ms,
+            comparison.potential_improvement_ms,
+        )
+
+    if sequential:
+        for i in range(iterations):
+            await _run_one(i)
+            if i < iterations - 1:
+                await _wait_for_rate_limit()
+    else:
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _bounded(i: int) -> None:
+            async with sem:
+                await _run_one(i)
 
-        if i < iterations - 1:
-            print("\n  Waiting 3 seconds before next iteration...")
-            await asyncio.sleep(3)
+        await asyncio.gather(*(_bounded(i) for i in range(iterations)))
 
     # 統計計算
-    ttft_values = [r.streaming.ttft_ms for r in results]
-    ttlt_values = [r.streaming.ttlt_ms for r in results]
-    ttfb_values = [r.api.ttfb_ms for r in results if r.api.ttfb_ms > 0]
-    improvement_values = [r.potential_improvement_ms for r in results if r.api.ttfb_ms > 0]
+    api_ok = arr[arr["ttfb"] > 0]
+    ttfb_values = api_ok["ttfb"]
+    improvement_values = api_ok["imp"]
+
+    def _stats(values: np.ndarray) -> dict:
+        if values.size == 0:
+            return {"mean": 0, "median": 0, "min": 0, "max": 0}
+        return {
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
 
+    improvement_stats = _stats(improvement_values)
     summary = {
-        "iterations": len(results),
-        "ttft_ms": {
-            "mean": statistics.mean(ttft_values),
-            "median": statistics.median(ttft_values),
-            "min": min(ttft_values),
-            "max": max(ttft_values),
-        },
-        "ttlt_ms": {
-            "mean": statistics.mean(ttlt_values),
-            "median": statistics.median(ttlt_values),
-            "min": min(ttlt_values),
-            "max": max(ttlt_values),
-        },
-        "ttfb_ms": {
-            "mean": statistics.mean(ttfb_values) if ttfb_values else 0,
-            "median": statistics.median(ttfb_values) if ttfb_values else 0,
-            "min": min(ttfb_values) if ttfb_values else 0,
-            "max": max(ttfb_values) if ttfb_values else 0,
-        },
+        "iterations": iterations,
+        "ttft_ms": _stats(arr["ttft"]),
+        "ttlt_ms": _stats(arr["ttlt"]),
+        "ttfb_ms": _stats(ttfb_values),
         "potential_improvement_ms": {
-            "mean": statistics.mean(improvement_values) if improvement_values else 0,
-            "median": statistics.median(improvement_values) if improvement_values else 0,
+            "mean": improvement_stats["mean"],
+            "median": improvement_stats["median"],
         }
     }
 
@@ -356,7 +452,7 @@ async def run_benchmark(project_id: str, prompt: str, iterations: int = 3) -> di
     print(f"    Mean:   {summary['ttlt_ms']['mean']:,.2f} ms")
     print(f"    Median: {summary['ttlt_ms']['median']:,.2f} ms")
 
-    if ttfb_values:
+    if ttfb_values.size:
         print(f"\n  TTFB (Current API):")
         print(f"    Mean:   {summary['ttfb_ms']['mean']:,.2f} ms")
         print(f"    Median: {summary['ttfb_ms']['median']:,.2f} ms")
@@ -379,15 +475,34 @@ async def run_benchmark(project_id: str, prompt: str, iterations: int = 3) -> di
 
 if __name__ == "__main__":
     # コマンドライン引数
-    if len(sys.argv) < 2:
-        print("Usage: python test_latency_measurement.py <project_id> [iterations]")
+    args = [arg for arg in sys.argv[1:] if arg != "--concurrent"]
+    sequential = "--concurrent" not in sys.argv[1:]
+
+    if len(args) < 1:
+        print("Usage: python test_latency_measurement.py <project_id> [iterations] [--concurrent]")
         print("\nExample:")
         print("  python test_latency_measurement.py 123e4567-e89b-12d3-a456-426614174000")
         print("  python test_latency_measurement.py 123e4567-e89b-12d3-a456-426614174000 5")
+        print("  python test_latency_measurement.py 123e4567-e89b-12d3-a456-426614174000 5 --concurrent")
         sys.exit(1)
 
-    project_id = sys.argv[1]
-    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    # .env読み込み（スクリプト実行時のみ）
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env.local"))
+    load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
+    API_BASE_URL = os.getenv("API_BASE_URL", API_BASE_URL)
+
+    # 進捗ログはキュー経由で別スレッドから出力する
+    log_queue = queue.SimpleQueue()
+    log_handler = logging.StreamHandler(sys.stdout)
+    log_handler.setFormatter(logging.Formatter("%(message)s"))
+    log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    log_listener.start()
+
+    project_id = args[0]
+    iterations = int(args[1]) if len(args) > 1 else 3
 
     prompt = """
 プロジェクトタイトル: ハッカソンサポートアプリ
@@ -406,10 +521,16 @@ AI機能を使って要件定義や技術選定のアドバイスを受けられ
     print("  3. Project ID exists in database")
 
     # 実行
-    summary = asyncio.run(run_benchmark(project_id, prompt, iterations))
+    summary = asyncio.run(run_benchmark(project_id, prompt, iterations, sequential=sequential))
 
     # 結果をJSONファイルに保存
     output_file = "latency_benchmark_result.json"
-    with open(output_file, "w") as f:
-        json.dump(summary, f, indent=2)
+    if ORJSON_AVAILABLE:
+        with open(output_file, "wb") as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_file, "w") as f:
+            json.dump(summary, f, indent=2)
     print(f"Results saved to {output_file}")
+
+    log_listener.stop()
@@ -14,26 +14,56 @@ Usage:
 """
 
 import json
-from typing import Iterable, Literal, Generator
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterable, AsyncGenerator, Dict, Iterable, Literal, Generator, Optional
+
+# NDJSON行のパースとSSEペイロードのシリアライズ用（未インストールなら標準の json を使う）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 Mode = Literal["ndjson", "json_array"]
 
+# NDJSON 1行分のパーサ（orjson.JSONDecodeError は json.JSONDecodeError のサブクラス）
+_LOADS = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# JSONDecoder はステートレスなので全インスタンスで共有する
+_DECODER = json.JSONDecoder()
+
+# json_array: 要素間の空白・カンマ（pos から C 側でまとめて読み飛ばす）
+_SKIP_SEPARATORS = re.compile(r"[ \r\n\t,]*").match
+
+# sse_event 用: コンパクト区切りのエンコーダとイベント名ごとのヘッダバイト列
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_SSE_EVENT_HEADERS: Dict[str, bytes] = {}
 
-class IncrementalJsonEmitter:
+
+class IncrementalJsonEmitter(ABC):
     """
     feed(text) を呼ぶたびに、確定した JSON object を順次 yield する。
 
+    IncrementalJsonEmitter(mode=...) はモードに応じたサブクラスのインスタンスを返す。
+
     Modes:
-        - ndjson: 1行 = 1 JSON オブジェクト（推奨）
-        - json_array: [obj1, obj2, ...] 形式の配列
+        - ndjson: 1行 = 1 JSON オブジェクト（推奨） -> NdjsonEmitter
+        - json_array: [obj1, obj2, ...] 形式の配列 -> JsonArrayEmitter
     """
 
-    def __init__(self, mode: Mode = "ndjson"):
-        self.mode = mode
+    # インスタンスはリクエストごとに作られ feed で頻繁に触るので __dict__ を持たせない
+    __slots__ = ("buf", "_fence_stripped")
+
+    mode: Mode
+
+    def __new__(cls, mode: Mode = "ndjson"):
+        if cls is IncrementalJsonEmitter:
+            cls = NdjsonEmitter if mode == "ndjson" else JsonArrayEmitter
+        return super().__new__(cls)
+
+    def __init__(self, mode: Optional[Mode] = None):
         self.buf = ""
-        self.decoder = json.JSONDecoder()
-        self.pos = 0
-        self.started = False  # for json_array
         self._fence_stripped = False
 
     def _strip_code_fence_once(self) -> None:
@@ -46,6 +76,7 @@ class IncrementalJsonEmitter:
             self.buf = b.split("\n", 1)[1] if "\n" in b else ""
         self._fence_stripped = True
 
+    @abstractmethod
     def feed(self, text: str) -> Generator[dict, None, None]:
         """
         テキストチャンクを受け取り、確定したJSONオブジェクトをyieldする。
@@ -56,57 +87,126 @@ class IncrementalJsonEmitter:
         Yields:
             確定したJSONオブジェクト（dict）
         """
+
+    def flush(self) -> Generator[dict, None, None]:
+        """
+        残りのバッファを処理して最後のオブジェクトを取得。
+        ストリーム終了時に呼び出す。
+        """
+        self.buf = ""
+        yield from ()
+
+
+class NdjsonEmitter(IncrementalJsonEmitter):
+    """NDJSON モード: 改行単位で確定"""
+
+    __slots__ = ("_scan",)
+
+    mode = "ndjson"
+
+    def __init__(self, mode: Optional[Mode] = None):
+        super().__init__()
+        # 改行探索の再開位置（同じ未確定部分をチャンクごとに先頭から走査し直さないため）
+        self._scan = 0
+
+    def feed(self, text: str) -> Generator[dict, None, None]:
         if not text:
             return
         self.buf += text
-        self._strip_code_fence_once()
+        if not self._fence_stripped:
+            self._strip_code_fence_once()
 
-        if self.mode == "ndjson":
-            yield from self._feed_ndjson()
-        else:
-            yield from self._feed_json_array()
+        # 最後の改行までを確定部分としてまとめて切り出し、一括で行分割する
+        last_nl = self.buf.rfind("\n", self._scan)
+        if last_nl == -1:
+            self._scan = len(self.buf)
+            return
+        complete = self.buf[:last_nl]
+        self.buf = self.buf[last_nl + 1:]
+        self._scan = len(self.buf)
 
-    def _feed_ndjson(self) -> Generator[dict, None, None]:
-        """NDJSON モード: 改行単位で確定"""
-        while True:
-            nl = self.buf.find("\n")
-            if nl == -1:
-                break
-            line = self.buf[:nl].strip()
-            self.buf = self.buf[nl + 1:]
+        for line in complete.split("\n"):
+            line = line.strip()
             if not line:
                 continue
             try:
-                obj = json.loads(line)
+                obj = _LOADS(line)
                 yield obj
             except json.JSONDecodeError:
                 # 不正な行はスキップ（ログに残すなら追加）
                 continue
 
-    def _feed_json_array(self) -> Generator[dict, None, None]:
-        """JSON配列モード: 配列要素を順次抽出"""
+    def flush(self) -> Generator[dict, None, None]:
+        rest = self.buf
+        self.buf = ""
+        self._scan = 0
+
+        # 最後の行（改行なし）を処理
+        line = rest.strip()
+        # 末尾のコードフェンスを除去（フェンスだけの行ならパースしない）
+        if line.endswith("```"):
+            line = line[:-3].rstrip()
+        if not line:
+            return
+        try:
+            obj = _LOADS(line)
+        except json.JSONDecodeError:
+            return
+        yield obj
+
+
+class JsonArrayEmitter(IncrementalJsonEmitter):
+    """JSON配列モード: 配列要素を順次抽出"""
+
+    __slots__ = ("pos", "started", "_retry_from")
+
+    mode = "json_array"
+
+    def __init__(self, mode: Optional[Mode] = None):
+        super().__init__()
+        self.pos = 0
+        self.started = False
+        # デコード失敗時のバッファ長（要素を閉じうる文字が届くまで再試行しない）
+        self._retry_from = 0
+
+    def feed(self, text: str) -> Generator[dict, None, None]:
+        if not text:
+            return
+        self.buf += text
+        if not self._fence_stripped:
+            self._strip_code_fence_once()
+
         # 配列開始を待つ
         if not self.started:
-            i = self.buf.find("[")
+            # 開始前は pos を「'[' 探索済みの位置」として使う
+            i = self.buf.find("[", self.pos)
             if i == -1:
+                self.pos = len(self.buf)
                 return
             self.started = True
             self.pos = i + 1
 
         while True:
             # 空白・カンマを飛ばす
-            while self.pos < len(self.buf) and self.buf[self.pos] in " \r\n\t,":
-                self.pos += 1
+            self.pos = _SKIP_SEPARATORS(self.buf, self.pos).end()
             if self.pos >= len(self.buf):
                 break
             if self.buf[self.pos] == "]":
                 # 完了
                 return
 
+            # 前回失敗以降に要素を閉じうる文字が届いていなければ、デコードを再試行しない
+            if self._retry_from and not any(
+                self.buf.find(c, self._retry_from) != -1 for c in "}],"
+            ):
+                break
+
             try:
-                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
             except json.JSONDecodeError:
+                self._retry_from = len(self.buf)
                 break  # 次チャンク待ち
+            self._retry_from = 0
             self.pos = end
             yield obj
 
@@ -115,25 +215,6 @@ class IncrementalJsonEmitter:
                 self.buf = self.buf[self.pos:]
                 self.pos = 0
 
-    def flush(self) -> Generator[dict, None, None]:
-        """
-        残りのバッファを処理して最後のオブジェクトを取得。
-        ストリーム終了時に呼び出す。
-        """
-        if self.mode == "ndjson":
-            # 最後の行（改行なし）を処理
-            line = self.buf.strip()
-            if line:
-                try:
-                    # 末尾のコードフェンスを除去
-                    if line.endswith("```"):
-                        line = line[:-3].strip()
-                    obj = json.loads(line)
-                    yield obj
-                except json.JSONDecodeError:
-                    pass
-        self.buf = ""
-
 
 def sse_event(event: str, data: dict) -> bytes:
     """
@@ -146,4 +227,32 @@ def sse_event(event: str, data: dict) -> bytes:
     Returns:
         SSE形式のバイト列
     """
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+    header = _SSE_EVENT_HEADERS.get(event)
+    if header is None:
+        header = _SSE_EVENT_HEADERS[event] = f"event: {event}\ndata: ".encode("utf-8")
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = _JSON_ENCODE(data).encode("utf-8")
+    # StreamingResponse は bytes をそのまま ASGI send に渡すので、ここで1回の確保で組み立てる
+    return b"".join((header, payload, b"\n\n"))
+
+
+async def sse_text_stream(chunks: AsyncIterable[str]) -> AsyncGenerator[bytes, None]:
+    """
+    テキストチャンクの非同期イテレータをSSEイベント列に変換する。
+
+    Yields:
+        - event: start -> {"ok": true}
+        - event: chunk -> {"text": "..."}
+        - event: done -> {"ok": true}
+        - event: error -> {"message": "..."}
+    """
+    yield sse_event("start", {"ok": True})
+    try:
+        async for text in chunks:
+            if text:
+                yield sse_event("chunk", {"text": text})
+        yield sse_event("done", {"ok": True})
+    except Exception as e:
+        yield sse_event("error", {"message": str(e)})
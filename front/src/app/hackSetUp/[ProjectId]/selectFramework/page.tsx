@@ -405,6 +405,7 @@ export default function SelectFramework() {
       const recommendations = await getFrameworkRecommendations(
         projectSpecification || "一般的なWebアプリケーション", // 仕様書がない場合はデフォルト値を使用
         "", // function_doc は今回は空文字
+        projectId,
       );
       setAiRecommendations(recommendations);
     } catch (error) {
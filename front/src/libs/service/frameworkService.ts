@@ -61,12 +61,14 @@ export interface FrameworkSelectionResponse {
 export const getFrameworkRecommendations = async (
   specification: string,
   functionDoc: string = "",
+  projectId?: string,
 ): Promise<FrameworkRecommendationResponse> => {
   const response = await axios.post(
     `${API_BASE_URL}/api/framework/recommendations`,
     {
       specification,
       function_doc: functionDoc,
+      project_id: projectId,
     },
     {
       headers: { "Content-Type": "application/json" },